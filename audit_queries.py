@@ -0,0 +1,219 @@
+# audit_queries.py
+# Query-plan auditor: flags full scans and temp B-trees in the portal's SQL.
+#
+# Collects every `db.prepare(...)` statement from the generator templates
+# (rendered in memory, same table as watch.py) and from src/**/*.js on disk,
+# plus the export queries in export_data.py. Each one is run through
+# EXPLAIN QUERY PLAN against a database built from the DB_JS schema and the
+# session store's table, seeded with school-sized data (then ANALYZEd), or
+# against --db. A template that fails to render fails the audit too.
+#
+# Usage:
+#   python audit_queries.py                   # report; exit 1 if a hot table is scanned
+#   python audit_queries.py --strict          # exit 1 on any finding
+#   python audit_queries.py --db data.sqlite  # audit against a real database
+#   python audit_queries.py --hot attendance,job_apps,users
+#
+# A statement may opt out with an SQL comment: /* audit: allow-scan */
+
+import argparse
+import glob
+import os
+import random
+import re
+import sqlite3
+import sys
+from datetime import date, timedelta
+
+import export_data
+from watch import TARGETS, load
+
+HOT_TABLES = ("attendance", "job_apps")
+ALLOW = "audit: allow-scan"
+
+# ---------- collecting SQL ----------
+PREPARE_RE = re.compile(
+    r"""\.prepare\(\s*(`(?:[^`\\]|\\.)*`|'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")""", re.S)
+
+def js_string(literal):
+    body = literal[1:-1]
+    return re.sub(r"\\(.)", r"\1", body)
+
+def sql_from_js(source, origin):
+    for m in PREPARE_RE.finditer(source):
+        lit = m.group(1)
+        if lit.startswith("`") and "${" in lit:
+            continue  # built at runtime; can't plan it statically
+        line = source.count("\n", 0, m.start()) + 1
+        yield f"{origin}:{line}", " ".join(js_string(lit).split())
+
+def collect():
+    """([(origin, sql)] de-duplicated on the SQL text, [(script, error)])."""
+    found, broken = [], []
+    rendered = set()
+    for script, render in TARGETS.items():
+        try:
+            outputs = render(load(script), os.getcwd())
+        except Exception as e:  # its SQL would go unaudited; main() fails on it
+            broken.append((script, f"{type(e).__name__}: {e}"))
+            continue
+        for rel, content in outputs:
+            if rel.endswith(".js"):
+                rendered.add(os.path.normpath(rel))
+                found += sql_from_js(content, f"{script} -> {rel}")
+    # Hand-written modules in the project that aren't generator outputs
+    for path in glob.glob(os.path.join("src", "**", "*.js"), recursive=True):
+        if os.path.normpath(path) not in rendered:
+            with open(path, encoding="utf-8") as f:
+                found += sql_from_js(f.read(), path)
+    for kind, spec in export_data.EXPORTS.items():
+        found.append((f"export_data.py EXPORTS[{kind!r}]", spec["sql"]))
+
+    seen, out = set(), []
+    for origin, sql in found:
+        if sql not in seen:
+            seen.add(sql)
+            out.append((origin, sql))
+    return out, broken
+
+# ---------- seeded database ----------
+def build_db(seed=True):
+    import make_sessionstore  # sessions table is created by the store itself
+    import termux_setup  # DB_JS lives there
+    conn = sqlite3.connect(":memory:")
+    # Run every db.exec(`...`) block in order; that's the schema + migrations
+    for source in (termux_setup.DB_JS, make_sessionstore.SESSIONSTORE_JS):
+        for block in re.findall(r"db\.exec\(`(.*?)`\)", source, re.S):
+            conn.executescript(block.replace("PRAGMA journal_mode = WAL;", ""))
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(users)")}
+    if "class_name" not in cols:
+        conn.execute("ALTER TABLE users ADD COLUMN class_name TEXT")
+    if seed:
+        seed_school(conn)
+    return conn
+
+def seed_school(conn, students=1200, days=180):
+    """Roughly one mid-size school year; enough for ANALYZE to matter."""
+    rnd = random.Random(7)
+    classes = ["JSS1", "JSS2", "JSS3", "SS1", "SS2", "SS3"]
+    users = [(i, f"Student {i}", f"s{i}@school.test", "student", classes[i % 6]) for i in range(1, students + 1)]
+    users += [(students + i, f"Staff {i}", f"t{i}@school.test", "teacher", None) for i in range(1, 61)]
+    conn.executemany("INSERT INTO users (id, name, email, role, class_name) VALUES (?, ?, ?, ?, ?)", users)
+    d0 = date(2024, 9, 2)
+    conn.executemany(
+        "INSERT OR IGNORE INTO attendance (student_id, date, status) VALUES (?, ?, ?)",
+        ((s, (d0 + timedelta(days=d)).isoformat(), rnd.choice(("present", "present", "present", "absent", "late")))
+         for d in range(days) for s in range(1, students + 1)))
+    conn.executemany("INSERT INTO jobs (id, title) VALUES (?, ?)", [(i, f"Job {i}") for i in range(1, 41)])
+    conn.executemany("INSERT INTO job_apps (job_id, name, email) VALUES (?, ?, ?)",
+                     [(1 + i % 40, f"Applicant {i}", f"a{i}@mail.test") for i in range(4000)])
+    conn.commit()
+    conn.execute("ANALYZE")
+
+# ---------- planning ----------
+def bindings(sql):
+    """NULL for every parameter; plans don't depend on the values here."""
+    stripped = re.sub(r"'(?:[^']|'')*'", "''", sql)
+    named = set(re.findall(r"[:@$]([A-Za-z_]\w*)", stripped))
+    if named:
+        return {n: None for n in named}
+    return [None] * stripped.count("?")
+
+def plan(conn, sql):
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, bindings(sql))]
+
+def aliases(sql):
+    """alias -> table for FROM/JOIN/UPDATE/INTO clauses."""
+    out = {}
+    for table, alias in re.findall(r"\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", sql, re.I):
+        if alias.upper() in {"WHERE", "ON", "SET", "JOIN", "LEFT", "INNER", "ORDER", "GROUP", "LIMIT", "VALUES", "USING"}:
+            alias = ""
+        out[alias or table] = table
+        out[table] = table
+    return out
+
+def suggest_index(conn, sql, alias, table):
+    """Columns of `table` used in equality, then range predicates."""
+    cols = [r[1] for r in conn.execute(f"PRAGMA table_info({table})")]
+    prefix = rf"(?:\b{re.escape(alias)}\.)?" if alias != table else rf"(?:\b{re.escape(table)}\.)?"
+    eq, rng = [], []
+    where = re.split(r"\bWHERE\b", sql, 1, re.I)[-1]
+    for col in cols:
+        if re.search(prefix + rf"\b{col}\s*(?:=|\bIN\b)", where, re.I):
+            eq.append(col)
+        elif re.search(prefix + rf"\b{col}\s*(?:<|>|\bBETWEEN\b)", where, re.I):
+            rng.append(col)
+    order = re.search(r"\bORDER BY\s+(.+?)(?:\bLIMIT\b|$)", sql, re.I)
+    if order and not rng:
+        for col in cols:
+            if re.search(prefix + rf"\b{col}\b", order.group(1)) and col not in eq:
+                rng.append(col)
+                break
+    keys = eq + rng[:1]
+    if not keys:
+        return None
+    return f"CREATE INDEX idx_{table}_{'_'.join(keys)} ON {table}({', '.join(keys)});"
+
+def findings(conn, sql, steps):
+    out = []
+    names = aliases(sql)
+    for step in steps:
+        m = re.match(r"SCAN (\w+)\b(?! VIRTUAL)( USING (?:COVERING )?INDEX)?", step)
+        if m and not step.startswith("SCAN CONSTANT"):
+            alias = m.group(1)
+            table = names.get(alias, alias)
+            if table.startswith("sqlite_") or not table.isidentifier():
+                continue
+            kind = "full index scan" if m.group(2) else "full table scan"
+            out.append((table, f"{kind} of {table}", suggest_index(conn, sql, alias, table)))
+        elif "USE TEMP B-TREE" in step:
+            out.append((None, step.lower().replace("use ", ""), None))
+        elif "AUTOMATIC" in step and "INDEX" in step:
+            table = step.split()[1]
+            out.append((table, f"automatic index on {table} (no usable index)", None))
+    return out
+
+# ---------- main ----------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="EXPLAIN QUERY PLAN audit for the portal's SQL")
+    ap.add_argument("--db", help="audit against this database instead of a seeded in-memory one")
+    ap.add_argument("--no-seed", action="store_true", help="schema only (planner uses default estimates)")
+    ap.add_argument("--hot", default=",".join(HOT_TABLES), help="tables whose scans fail the check")
+    ap.add_argument("--strict", action="store_true", help="fail on any finding, not just hot tables")
+    ap.add_argument("--verbose", "-v", action="store_true", help="print every plan")
+    args = ap.parse_args(argv)
+
+    hot = {t.strip() for t in args.hot.split(",") if t.strip()}
+    conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True) if args.db else build_db(seed=not args.no_seed)
+    queries, broken = collect()
+
+    failures = warnings = 0
+    for script, error in broken:
+        print(f"❌ {script}\n   cannot render: {error}")
+        failures += 1
+    for origin, sql in queries:
+        try:
+            steps = plan(conn, sql)
+        except sqlite3.Error as e:
+            print(f"❌ {origin}\n   {sql}\n   cannot plan: {e}")
+            failures += 1
+            continue
+        issues = [] if ALLOW in sql else findings(conn, sql, steps)
+        if not issues and not args.verbose:
+            continue
+        print(f"{'⚠️ ' if issues else '✓'} {origin}\n   {sql}")
+        for step in steps:
+            print(f"     · {step}")
+        for table, what, index in issues:
+            is_hot = args.strict or (table in hot)
+            failures += is_hot
+            warnings += not is_hot
+            print(f"   {'❌' if is_hot else '•'} {what}")
+            if index:
+                print(f"     suggest: {index}")
+
+    print(f"\n{len(queries)} statements audited: {failures} failing, {warnings} warning(s)")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+# backup_db.py
+# Online, non-blocking backups of the portal's SQLite database (data.sqlite).
+#
+# Uses SQLite's online backup API, copying a few hundred pages at a time with
+# a short sleep between steps, so the server keeps writing while a backup runs
+# (a plain file copy of a live WAL database is not safe). db.js enables WAL;
+# on a rollback-journal database the copy would hold off writers instead.
+#
+# Usage:
+#   python backup_db.py backup                 # snapshot -> backups/data-YYYYmmdd-HHMMSS.sqlite.gz
+#   python backup_db.py backup --keep 14       # keep the newest 14 snapshots
+#   python backup_db.py list
+#   python backup_db.py verify [SNAPSHOT]      # integrity_check (default: newest)
+#   python backup_db.py restore SNAPSHOT --yes # verify, save current DB, then restore
+
+import argparse
+import gzip
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+DEFAULT_DB = "data.sqlite"
+DEFAULT_DIR = "backups"
+DEFAULT_KEEP = 7
+PAGES_PER_STEP = 256      # ~1 MB with 4 KiB pages
+SLEEP_BETWEEN_STEPS = 0.05
+
+# ---------- helpers ----------
+def snapshot_prefix(db_path: str) -> str:
+    return os.path.splitext(os.path.basename(db_path))[0] + "-"
+
+def list_snapshots(db_path: str, backup_dir: str):
+    """Snapshots for this database, oldest first (names sort by timestamp)."""
+    if not os.path.isdir(backup_dir):
+        return []
+    prefix = snapshot_prefix(db_path)
+    names = [n for n in os.listdir(backup_dir) if n.startswith(prefix) and n.endswith(".sqlite.gz")]
+    return [os.path.join(backup_dir, n) for n in sorted(names)]
+
+def online_copy(src: sqlite3.Connection, dst: sqlite3.Connection, pages: int, sleep: float):
+    """Copy src into dst `pages` at a time, pausing `sleep` seconds between steps.
+
+    The source connection holds one read transaction for the whole copy. In WAL
+    mode that pins a consistent snapshot without blocking writers, and it stops
+    SQLite from restarting the copy every time another connection commits
+    (which otherwise never finishes on a busy database).
+    """
+    shown = [-1]
+
+    def progress(_status, remaining, total):
+        done = total - remaining
+        pct = 100 * done // total if total else 100
+        if pct // 10 != shown[0]:
+            shown[0] = pct // 10
+            print(f"  {done}/{total} pages ({pct}%)", flush=True)
+        if remaining and sleep:
+            time.sleep(sleep)  # yield I/O to the live server between steps
+
+    src.isolation_level = None
+    src.execute("BEGIN")
+    try:
+        src.execute("SELECT count(*) FROM sqlite_master").fetchone()  # take the read snapshot
+        src.backup(dst, pages=pages, progress=progress)
+    finally:
+        src.execute("COMMIT")
+
+def gzip_file(src_path: str, dst_path: str):
+    tmp = dst_path + ".partial"
+    with open(src_path, "rb") as rf, gzip.open(tmp, "wb", compresslevel=6) as wf:
+        shutil.copyfileobj(rf, wf, 1024 * 1024)
+    os.replace(tmp, dst_path)  # never leave a half-written snapshot behind
+
+def gunzip_to_temp(snapshot: str) -> str:
+    fd, tmp = tempfile.mkstemp(suffix=".sqlite")
+    with os.fdopen(fd, "wb") as wf, gzip.open(snapshot, "rb") as rf:
+        shutil.copyfileobj(rf, wf, 1024 * 1024)
+    return tmp
+
+def check_integrity(db_file: str):
+    """Return (ok, message) from PRAGMA integrity_check plus a table count."""
+    conn = sqlite3.connect(f"file:{db_file}?mode=ro", uri=True)
+    try:
+        rows = conn.execute("PRAGMA integrity_check").fetchall()
+        tables = conn.execute("SELECT count(*) FROM sqlite_master WHERE type = 'table'").fetchone()[0]
+    except sqlite3.DatabaseError as e:
+        return False, str(e)
+    finally:
+        conn.close()
+    if rows != [("ok",)]:
+        return False, "; ".join(r[0] for r in rows[:5])
+    return True, f"{tables} tables"
+
+def rotate(db_path: str, backup_dir: str, keep: int):
+    for old in list_snapshots(db_path, backup_dir)[:-keep or None]:
+        os.remove(old)
+        print(f"• Rotated out {os.path.basename(old)}")
+
+# ---------- commands ----------
+def backup(db_path: str, backup_dir: str, keep: int, pages: int, sleep: float, label: str = "") -> str:
+    if not os.path.exists(db_path):
+        raise SystemExit(f"❌ {db_path} not found")
+    os.makedirs(backup_dir, exist_ok=True)
+
+    ts = datetime.now().strftime("%Y%m%d-%H%M%S")
+    name = f"{snapshot_prefix(db_path)}{ts}{label}.sqlite.gz"
+    target = os.path.join(backup_dir, name)
+
+    fd, tmp = tempfile.mkstemp(suffix=".sqlite", dir=backup_dir)
+    os.close(fd)
+    try:
+        print(f"Backing up {db_path} (online, {pages} pages/step)…")
+        src = sqlite3.connect(db_path, timeout=30)
+        dst = sqlite3.connect(tmp)
+        try:
+            online_copy(src, dst, pages, sleep)
+        finally:
+            dst.close()
+            src.close()
+        gzip_file(tmp, target)
+    finally:
+        os.remove(tmp)
+
+    print(f"✓ Wrote {target} ({os.path.getsize(target) // 1024} KiB)")
+    if keep > 0:
+        rotate(db_path, backup_dir, keep)
+    return target
+
+def verify(snapshot: str) -> bool:
+    tmp = gunzip_to_temp(snapshot)
+    try:
+        ok, msg = check_integrity(tmp)
+    finally:
+        os.remove(tmp)
+    print(f"{'✓' if ok else '❌'} {os.path.basename(snapshot)}: {msg}")
+    return ok
+
+def restore(snapshot: str, db_path: str, backup_dir: str, pages: int, sleep: float):
+    tmp = gunzip_to_temp(snapshot)
+    try:
+        ok, msg = check_integrity(tmp)
+        if not ok:
+            raise SystemExit(f"❌ Refusing to restore a corrupt snapshot: {msg}")
+
+        if os.path.exists(db_path):
+            # Snapshot the current state first so a bad restore can be undone
+            backup(db_path, backup_dir, keep=0, pages=pages, sleep=sleep, label="-pre-restore")
+
+        # Write through the backup API as well, so open server connections see
+        # a consistent database instead of a file swapped under them.
+        print(f"Restoring {os.path.basename(snapshot)} -> {db_path}…")
+        src = sqlite3.connect(tmp)
+        dst = sqlite3.connect(db_path, timeout=30)
+        try:
+            online_copy(src, dst, pages, sleep)
+        finally:
+            dst.close()
+            src.close()
+    finally:
+        os.remove(tmp)
+    print(f"✓ Restored {db_path}")
+
+# ---------- main ----------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Online backups for the portal SQLite database")
+    ap.add_argument("--db", default=DEFAULT_DB, help=f"database file (default: {DEFAULT_DB})")
+    ap.add_argument("--dir", default=DEFAULT_DIR, help=f"snapshot directory (default: {DEFAULT_DIR})")
+    ap.add_argument("--pages", type=int, default=PAGES_PER_STEP, help="pages copied per step")
+    ap.add_argument("--sleep", type=float, default=SLEEP_BETWEEN_STEPS, help="seconds between steps")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("backup", help="take a compressed snapshot")
+    p.add_argument("--keep", type=int, default=DEFAULT_KEEP, help="snapshots to keep (0 = all)")
+    sub.add_parser("list", help="list snapshots")
+    p = sub.add_parser("verify", help="integrity-check a snapshot (default: newest)")
+    p.add_argument("snapshot", nargs="?")
+    p = sub.add_parser("restore", help="restore a snapshot over the database")
+    p.add_argument("snapshot")
+    p.add_argument("--yes", action="store_true", help="confirm overwriting the database")
+
+    args = ap.parse_args(argv)
+
+    if args.cmd == "backup":
+        backup(args.db, args.dir, args.keep, args.pages, args.sleep)
+    elif args.cmd == "list":
+        snaps = list_snapshots(args.db, args.dir)
+        if not snaps:
+            print(f"No snapshots in {args.dir}/")
+        for s in snaps:
+            print(f"  {os.path.basename(s)}  {os.path.getsize(s) // 1024} KiB")
+    elif args.cmd == "verify":
+        snaps = [args.snapshot] if args.snapshot else list_snapshots(args.db, args.dir)[-1:]
+        if not snaps:
+            raise SystemExit(f"❌ No snapshots in {args.dir}/")
+        sys.exit(0 if verify(snaps[0]) else 1)
+    elif args.cmd == "restore":
+        if not args.yes:
+            raise SystemExit("❌ Restore overwrites the database; re-run with --yes")
+        restore(args.snapshot, args.db, args.dir, args.pages, args.sleep)
+
+if __name__ == "__main__":
+    main()
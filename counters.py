@@ -0,0 +1,187 @@
+# counters.py
+# Trigger-maintained counters for the admin overview, plus drift repair.
+#
+# db.js creates a small `counters` table (name -> value) and triggers on
+# users, jobs, job_apps and attendance that adjust it on every insert, update
+# and delete, so GET /admin/overview is one primary-key read instead of
+# COUNT(*) over growing tables. The `counters_expected` view recomputes the
+# same numbers the slow way; this script compares the two.
+#
+# Counter names:
+#   users:role:<role>             users per role
+#   jobs                          job postings
+#   job_apps                      applications (all jobs)
+#   job_apps:job:<job_id>         applications per job
+#   attendance:<date>:<status>    attendance rows per day and status
+#
+# Usage:
+#   python counters.py check               # exit 1 if any counter drifted
+#   python counters.py repair              # recompute all counters in one transaction
+#   python counters.py show [PREFIX]       # print stored counters
+#   python counters.py --db other.sqlite check
+#
+# Drift only happens if rows are changed with the triggers absent (e.g. a DB
+# edited by an old build or restored from an old snapshot); repair is safe to
+# run while the server is up.
+
+import argparse
+import sqlite3
+import sys
+
+DEFAULT_DB = "data.sqlite"
+
+# Injected into termux_setup.DB_JS; idempotent, so it also runs on every start.
+COUNTERS_SQL = """\
+  CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL DEFAULT 0
+  ) WITHOUT ROWID;
+
+  CREATE VIEW IF NOT EXISTS counters_expected AS
+    SELECT 'users:role:' || role AS name, count(*) AS value FROM users GROUP BY role
+    UNION ALL SELECT 'jobs', count(*) FROM jobs
+    UNION ALL SELECT 'job_apps', count(*) FROM job_apps
+    UNION ALL SELECT 'job_apps:job:' || job_id, count(*) FROM job_apps GROUP BY job_id
+    UNION ALL SELECT 'attendance:' || date || ':' || status, count(*) FROM attendance GROUP BY date, status;
+
+  CREATE TRIGGER IF NOT EXISTS trg_users_count_ins AFTER INSERT ON users BEGIN
+    INSERT INTO counters (name, value) VALUES ('users:role:' || NEW.role, 1)
+      ON CONFLICT (name) DO UPDATE SET value = value + 1;
+  END;
+  CREATE TRIGGER IF NOT EXISTS trg_users_count_del AFTER DELETE ON users BEGIN
+    UPDATE counters SET value = value - 1 WHERE name = 'users:role:' || OLD.role;
+  END;
+  CREATE TRIGGER IF NOT EXISTS trg_users_count_upd AFTER UPDATE OF role ON users
+  WHEN OLD.role IS NOT NEW.role BEGIN
+    UPDATE counters SET value = value - 1 WHERE name = 'users:role:' || OLD.role;
+    INSERT INTO counters (name, value) VALUES ('users:role:' || NEW.role, 1)
+      ON CONFLICT (name) DO UPDATE SET value = value + 1;
+  END;
+
+  CREATE TRIGGER IF NOT EXISTS trg_jobs_count_ins AFTER INSERT ON jobs BEGIN
+    INSERT INTO counters (name, value) VALUES ('jobs', 1)
+      ON CONFLICT (name) DO UPDATE SET value = value + 1;
+  END;
+  CREATE TRIGGER IF NOT EXISTS trg_jobs_count_del AFTER DELETE ON jobs BEGIN
+    UPDATE counters SET value = value - 1 WHERE name = 'jobs';
+  END;
+
+  CREATE TRIGGER IF NOT EXISTS trg_job_apps_count_ins AFTER INSERT ON job_apps BEGIN
+    INSERT INTO counters (name, value) VALUES ('job_apps', 1), ('job_apps:job:' || NEW.job_id, 1)
+      ON CONFLICT (name) DO UPDATE SET value = value + 1;
+  END;
+  CREATE TRIGGER IF NOT EXISTS trg_job_apps_count_del AFTER DELETE ON job_apps BEGIN
+    UPDATE counters SET value = value - 1 WHERE name IN ('job_apps', 'job_apps:job:' || OLD.job_id);
+  END;
+  CREATE TRIGGER IF NOT EXISTS trg_job_apps_count_upd AFTER UPDATE OF job_id ON job_apps
+  WHEN OLD.job_id IS NOT NEW.job_id BEGIN
+    UPDATE counters SET value = value - 1 WHERE name = 'job_apps:job:' || OLD.job_id;
+    INSERT INTO counters (name, value) VALUES ('job_apps:job:' || NEW.job_id, 1)
+      ON CONFLICT (name) DO UPDATE SET value = value + 1;
+  END;
+
+  CREATE TRIGGER IF NOT EXISTS trg_attendance_count_ins AFTER INSERT ON attendance BEGIN
+    INSERT INTO counters (name, value) VALUES ('attendance:' || NEW.date || ':' || NEW.status, 1)
+      ON CONFLICT (name) DO UPDATE SET value = value + 1;
+  END;
+  CREATE TRIGGER IF NOT EXISTS trg_attendance_count_del AFTER DELETE ON attendance BEGIN
+    UPDATE counters SET value = value - 1 WHERE name = 'attendance:' || OLD.date || ':' || OLD.status;
+  END;
+  CREATE TRIGGER IF NOT EXISTS trg_attendance_count_upd AFTER UPDATE OF date, status ON attendance
+  WHEN OLD.date IS NOT NEW.date OR OLD.status IS NOT NEW.status BEGIN
+    UPDATE counters SET value = value - 1 WHERE name = 'attendance:' || OLD.date || ':' || OLD.status;
+    INSERT INTO counters (name, value) VALUES ('attendance:' || NEW.date || ':' || NEW.status, 1)
+      ON CONFLICT (name) DO UPDATE SET value = value + 1;
+  END;
+"""
+
+# Stored vs recomputed; a counter missing on either side counts as 0
+DRIFT_SQL = """
+SELECT n.name, coalesce(c.value, 0) AS stored, coalesce(e.value, 0) AS expected
+FROM (SELECT name FROM counters UNION SELECT name FROM counters_expected) AS n
+LEFT JOIN counters AS c ON c.name = n.name
+LEFT JOIN counters_expected AS e ON e.name = n.name
+WHERE coalesce(c.value, 0) != coalesce(e.value, 0)
+ORDER BY n.name
+"""
+
+# ---------- commands ----------
+def connect(db_path):
+    conn = sqlite3.connect(db_path, timeout=5, isolation_level=None)
+    conn.execute("PRAGMA busy_timeout = 5000")
+    # Same bootstrap as db.js (a no-op once the server has run)
+    conn.execute("BEGIN IMMEDIATE")
+    fresh = not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'counters'").fetchone()
+    for stmt in split_sql(COUNTERS_SQL):
+        conn.execute(stmt)
+    if fresh:
+        conn.execute("INSERT INTO counters (name, value) SELECT name, value FROM counters_expected")
+    conn.execute("COMMIT")
+    return conn
+
+def split_sql(script):
+    """Statements of a script; executescript() would commit our transaction."""
+    stmt = ""
+    for line in script.splitlines(keepends=True):
+        stmt += line
+        if sqlite3.complete_statement(stmt):
+            yield stmt.strip()
+            stmt = ""
+
+def drift(conn):
+    return conn.execute(DRIFT_SQL).fetchall()
+
+def check(conn):
+    rows = drift(conn)
+    for name, stored, expected in rows:
+        print(f"  ✗ {name}: stored {stored}, actual {expected}")
+    total = conn.execute("SELECT count(*) FROM counters").fetchone()[0]
+    print(f"{'❌' if rows else '✅'} {total} counters, {len(rows)} drifted")
+    return not rows
+
+def repair(conn):
+    # IMMEDIATE: writers wait on busy_timeout, so nothing lands between
+    # the recount and the swap
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        fixed = len(drift(conn))
+        conn.execute("DELETE FROM counters")
+        conn.execute("INSERT INTO counters (name, value) SELECT name, value FROM counters_expected")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    print(f"✅ Recomputed counters ({fixed} corrected)")
+
+def show(conn, prefix):
+    rows = conn.execute(
+        "SELECT name, value FROM counters WHERE name >= ? AND name < ? ORDER BY name",
+        (prefix, prefix + "\U0010ffff")).fetchall()
+    for name, value in rows:
+        print(f"  {name:<40} {value}")
+    if not rows:
+        print(f"No counters{f' starting with {prefix!r}' if prefix else ''}")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Check or repair the admin dashboard counters")
+    ap.add_argument("--db", default=DEFAULT_DB, help=f"database file (default: {DEFAULT_DB})")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("check", help="compare counters with a full recount (exit 1 on drift)")
+    sub.add_parser("repair", help="recompute every counter")
+    p = sub.add_parser("show", help="print stored counters")
+    p.add_argument("prefix", nargs="?", default="")
+    args = ap.parse_args(argv)
+
+    try:
+        conn = connect(args.db)
+    except sqlite3.Error as e:
+        raise SystemExit(f"❌ {args.db}: {e}")
+    if args.cmd == "check":
+        sys.exit(0 if check(conn) else 1)
+    elif args.cmd == "repair":
+        repair(conn)
+    elif args.cmd == "show":
+        show(conn, args.prefix)
+
+if __name__ == "__main__":
+    main()
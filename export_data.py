@@ -0,0 +1,256 @@
+# export_data.py
+# Constant-memory exports of attendance registers and job applications.
+#
+# Rows are read in keyset-paginated chunks (never the whole table) and written
+# straight into a gzip/CSV or NDJSON stream, so memory stays flat no matter how
+# many years of data are exported. The same SQL is baked into
+# src/utils/export.js, which the admin router uses for streaming downloads.
+#
+# Usage:
+#   python export_data.py attendance --from 2025-01-01 --to 2025-07-31 --class JSS1
+#   python export_data.py attendance --format ndjson --out attendance.ndjson.gz
+#   python export_data.py job_apps --job 3 --out -            # plain CSV to stdout
+#   python export_data.py write-js [/path/to/app]             # (re)write src/utils/export.js
+#
+# HTTP (admin session required):
+#   GET /admin/export/attendance.csv?from=2025-01-01&to=2025-07-31&class=JSS1
+#   GET /admin/export/job_apps.ndjson?job=3&gzip=0
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime
+
+DEFAULT_DB = "data.sqlite"
+CHUNK_ROWS = 1000
+
+# Each export pages on (key, id): the lower bound max(:from, :after_key) is a
+# single constant, so every chunk is an index seek that starts where the last
+# one stopped (a row-value comparison would rescan from :from each time).
+# :filter is the optional class (attendance) or job id (job_apps).
+EXPORTS = {
+    "attendance": {
+        "filter": "class",
+        "columns": ["id", "date", "student_id", "student_name", "class_name", "status"],
+        "sql": (
+            "SELECT a.id, a.date, a.student_id, u.name AS student_name, u.class_name, a.status, "
+            "a.date AS _key "
+            "FROM attendance a JOIN users u ON u.id = a.student_id "
+            "WHERE a.date >= max(:from, :after_key) AND a.date <= :to "
+            "AND (a.date > :after_key OR a.id > :after_id) "
+            "AND (:filter IS NULL OR u.class_name = :filter) "
+            "ORDER BY a.date, a.id LIMIT :limit"
+        ),
+    },
+    "job_apps": {
+        "filter": "job",
+        "columns": ["id", "created_at", "job_id", "job_title", "name", "email", "resume"],
+        "sql": (
+            "SELECT ja.id, ja.created_at, ja.job_id, j.title AS job_title, ja.name, ja.email, ja.resume, "
+            "ja.created_at AS _key "
+            "FROM job_apps ja JOIN jobs j ON j.id = ja.job_id "
+            "WHERE ja.created_at >= max(:from, :after_key) AND ja.created_at <= :to || ' 23:59:59' "
+            "AND (ja.created_at > :after_key OR ja.id > :after_id) "
+            "AND (:filter IS NULL OR ja.job_id = :filter) "
+            "ORDER BY ja.created_at, ja.id LIMIT :limit"
+        ),
+    },
+}
+
+EXPORT_JS = r"""// src/utils/export.js
+// Streaming, constant-memory exports (generated by export_data.py — edit there).
+// Rows are fetched in keyset-paginated chunks so the DB connection is never held
+// across an await, and written through gzip with backpressure.
+const zlib = require('zlib');
+
+const EXPORTS = __EXPORTS__;
+const CHUNK_ROWS = __CHUNK_ROWS__;
+
+// Text starting with = + - @ tab or CR is a formula to Excel/Sheets, and
+// applicant names/emails come from the public form: prefix ' and quote it.
+function csvField(v) {
+  if (v === null || v === undefined) return '';
+  const s = String(v);
+  if (typeof v === 'string' && /^[=+\-@\t\r]/.test(s)) return `"'${s.replace(/"/g, '""')}"`;
+  return /[",\r\n]/.test(s) ? `"${s.replace(/"/g, '""')}"` : s;
+}
+
+function params(req, spec) {
+  const q = req.query;
+  const date = (v, dflt) => (/^\d{4}-\d{2}-\d{2}$/.test(v || '') ? v : dflt);
+  return {
+    from: date(q.from, '0000-01-01'),
+    to: date(q.to, '9999-12-31'),
+    filter: q[spec.filter] ? String(q[spec.filter]) : null,
+  };
+}
+
+// Resolves once `out` drains, or the response closes (so an aborted download never hangs).
+function write(out, res, chunk) {
+  if (out.write(chunk)) return null;
+  return new Promise((resolve) => {
+    const done = () => { out.off('drain', done); res.off('close', done); resolve(); };
+    out.on('drain', done);
+    res.on('close', done);
+  });
+}
+
+/**
+ * Express handler: GET /export/:kind.:format  (kind = attendance | job_apps,
+ * format = csv | ndjson). Gzipped unless ?gzip=0.
+ */
+function handler(db) {
+  const stmts = {};
+  for (const [kind, spec] of Object.entries(EXPORTS)) stmts[kind] = db.prepare(spec.sql);
+
+  return async (req, res, next) => {
+    const { kind, format } = req.params;
+    const spec = EXPORTS[kind];
+    if (!spec || !['csv', 'ndjson'].includes(format)) return next();
+
+    const gzip = req.query.gzip !== '0';
+    const filename = `${kind}-${new Date().toISOString().slice(0, 10)}.${format}${gzip ? '.gz' : ''}`;
+    res.setHeader('Content-Disposition', `attachment; filename="${filename}"`);
+    res.type(gzip ? 'application/gzip' : format === 'csv' ? 'text/csv' : 'application/x-ndjson');
+
+    let out = res;
+    if (gzip) {
+      out = zlib.createGzip();
+      out.pipe(res);
+    }
+
+    let aborted = false;
+    res.on('close', () => { aborted = !res.writableFinished; }); // client went away
+
+    try {
+      const p = { ...params(req, spec), after_key: '', after_id: 0, limit: CHUNK_ROWS };
+      if (format === 'csv') await write(out, res, spec.columns.join(',') + '\n');
+      for (;;) {
+        const rows = stmts[kind].all(p);
+        if (!rows.length || aborted) break;
+        let buf = '';
+        for (const row of rows) {
+          if (format === 'csv') buf += spec.columns.map((c) => csvField(row[c])).join(',') + '\n';
+          else buf += JSON.stringify(Object.fromEntries(spec.columns.map((c) => [c, row[c]]))) + '\n';
+        }
+        await write(out, res, buf);
+        const last = rows[rows.length - 1];
+        p.after_key = last._key;
+        p.after_id = last.id;
+        if (rows.length < CHUNK_ROWS) break;
+      }
+      out.end();
+    } catch (err) {
+      if (!res.headersSent) return next(err);
+      console.error('Export failed:', err);
+      res.destroy(err);
+    }
+  };
+}
+
+module.exports = { EXPORTS, handler };
+""".replace("__EXPORTS__", json.dumps(EXPORTS, indent=2)).replace("__CHUNK_ROWS__", str(CHUNK_ROWS))
+
+# ---------- export ----------
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+def csv_cell(v):
+    """Same rule as csvField in export.js: text that spreadsheets would run as a
+    formula gets a leading ' (csv.writer quotes it if it needs quoting)."""
+    if isinstance(v, str) and v.startswith(FORMULA_PREFIXES):
+        return "'" + v
+    return v
+
+def iter_rows(conn, kind, date_from, date_to, flt, chunk=CHUNK_ROWS):
+    """Yield row dicts chunk by chunk; at most `chunk` rows are held at once."""
+    spec = EXPORTS[kind]
+    p = {"from": date_from, "to": date_to, "filter": flt, "after_key": "", "after_id": 0, "limit": chunk}
+    while True:
+        rows = conn.execute(spec["sql"], p).fetchall()
+        for row in rows:
+            yield row
+        if len(rows) < chunk:
+            return
+        p["after_key"], p["after_id"] = rows[-1]["_key"], rows[-1]["id"]
+
+def open_output(path):
+    if path == "-":
+        return io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", newline=""), False
+    if path.endswith(".gz"):
+        return gzip.open(path, "wt", encoding="utf-8", newline="", compresslevel=6), True
+    return open(path, "w", encoding="utf-8", newline=""), True
+
+def export(db_path, kind, fmt, out_path, date_from, date_to, flt):
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    columns = EXPORTS[kind]["columns"]
+    out, close = open_output(out_path)
+    n = 0
+    try:
+        writer = csv.writer(out, lineterminator="\n") if fmt == "csv" else None
+        if writer:
+            writer.writerow(columns)
+        for row in iter_rows(conn, kind, date_from, date_to, flt):
+            if writer:
+                writer.writerow([csv_cell(row[c]) for c in columns])
+            else:
+                out.write(json.dumps({c: row[c] for c in columns}) + "\n")
+            n += 1
+    finally:
+        out.flush()
+        if close:
+            out.close()
+        conn.close()
+    return n
+
+# ---------- JS module ----------
+def write_js(target):
+    path = os.path.join(target, "src", "utils", "export.js")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        ts = datetime.now().strftime("%Y%m%d-%H%M%S")
+        with open(path, "rb") as rf, open(f"{path}.bak-{ts}", "wb") as wf:
+            wf.write(rf.read())
+        print(f"• Backed up existing file to {path}.bak-{ts}")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(EXPORT_JS)
+    print(f"✓ Wrote {path}")
+
+# ---------- main ----------
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["write-js"]:
+        write_js(os.path.abspath(argv[1] if len(argv) > 1 else os.getcwd()))
+        return
+
+    ap = argparse.ArgumentParser(description="Stream attendance / job application exports")
+    ap.add_argument("kind", choices=sorted(EXPORTS))
+    ap.add_argument("--db", default=DEFAULT_DB)
+    ap.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    ap.add_argument("--out", help="output file ('.gz' = gzip, '-' = stdout); default <kind>-<date>.<fmt>.gz")
+    ap.add_argument("--from", dest="date_from", default="0000-01-01", help="YYYY-MM-DD (inclusive)")
+    ap.add_argument("--to", dest="date_to", default="9999-12-31", help="YYYY-MM-DD (inclusive)")
+    ap.add_argument("--class", dest="class_name", help="attendance: only this class")
+    ap.add_argument("--job", type=int, help="job_apps: only this job id")
+    args = ap.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        raise SystemExit(f"❌ {args.db} not found")
+    flt = args.class_name if args.kind == "attendance" else args.job
+    out = args.out or f"{args.kind}-{datetime.now():%Y-%m-%d}.{args.format}.gz"
+
+    try:
+        n = export(args.db, args.kind, args.format, out, args.date_from, args.date_to, flt)
+    except BrokenPipeError:  # e.g. `--out - | head`
+        sys.stderr.close()
+        return
+    if out != "-":
+        print(f"✓ Exported {n} {args.kind} rows -> {out}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
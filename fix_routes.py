@@ -1,5 +1,6 @@
 # fix_routes.py
-# Creates/overwrites src/routes/*.js and safely wires them in server.js
+# Creates/overwrites src/routes/*.js (plus the src/utils/validate.js they share)
+# and safely wires them in server.js
 
 import os, textwrap
 
@@ -7,8 +8,7 @@ PROJECT_ROOT = os.getcwd()
 ROUTES_DIR = os.path.join(PROJECT_ROOT, "src", "routes")
 SERVER_JS = os.path.join(PROJECT_ROOT, "server.js")
 
-os.makedirs(ROUTES_DIR, exist_ok=True)
-
+# Route manifest: (file name, page title, who)
 routes = [
     ("admin",   "Admin Home",   "Admin"),
     ("teacher", "Teacher Home", "Teacher"),
@@ -19,28 +19,256 @@ routes = [
 
 TEMPLATE = """\
 const express = require('express');
+const health = require('../utils/health');
 const router = express.Router();
 
-router.get('/health', (req, res) => {{
-  res.json({{ ok: true, service: '{service}' }});
-}});
+// Cached readiness (see src/utils/health.js); never probes on request.
+router.get('/health', health.handler('ready', {{ service: '{service}' }}));
+
+{home}{extra}
+module.exports = router;
+"""
 
+DEFAULT_HOME = """\
 router.get('/', (req, res) => {{
   res.render('page', {{ title: '{title}', who: '{who}' }});
 }});
+"""
 
-module.exports = router;
+# Attendance summary shared by the student and parent dashboards; both
+# queries seek ux_attendance_student_date.
+ATTENDANCE_SUMMARY = """
+const ATTENDANCE_DAYS = 90;
+const attendanceCounts = db.prepare(`
+  SELECT status, count(*) AS n FROM attendance
+  WHERE student_id = ? AND date >= ? GROUP BY status
+`);
+const recentAttendance = db.prepare(`
+  SELECT date, status FROM attendance WHERE student_id = ? ORDER BY date DESC LIMIT 10
+`);
+
+function attendanceFor(studentId) {
+  const since = new Date(Date.now() - ATTENDANCE_DAYS * 864e5).toISOString().slice(0, 10);
+  const counts = {};
+  for (const { status, n } of attendanceCounts.all(studentId, since)) counts[status] = n;
+  return { since, counts, recent: recentAttendance.all(studentId) };
+}
+"""
+
+# Dashboards served through src/utils/pagecache.js: a repeat visit skips the
+# queries and the render until a writer invalidates one of the page's tags.
+HOMES = {
+    "student": """\
+const db = require('../../db');
+const pagecache = require('../utils/pagecache');
+{attendance}
+router.get('/', pagecache.page({{ tags: (req) => [`student:${{req.session.user.id}}`] }}, (req, res) => {{
+  const user = req.session.user;
+  if (!user || user.role !== 'student') return res.render('page', {{ title: '{title}', who: '{who}' }});
+  res.render('page', {{ title: '{title}', who: '{who}', user, attendance: attendanceFor(user.id) }});
+}}));
+""",
+    "parent": """\
+const db = require('../../db');
+const pagecache = require('../utils/pagecache');
+{attendance}
+const childIds = db.prepare('SELECT student_id FROM parent_student WHERE parent_id = ?').pluck();
+const children = db.prepare(`
+  SELECT u.id, u.name, u.class_name FROM parent_student AS ps
+  JOIN users AS u ON u.id = ps.student_id
+  WHERE ps.parent_id = ? ORDER BY u.name
+`);
+
+// Tags: the parent (child links) plus each child (attendance)
+const parentTags = (req) => {{
+  const id = req.session.user.id;
+  return [`parent:${{id}}`, ...childIds.all(id).map((s) => `student:${{s}}`)];
+}};
+
+router.get('/', pagecache.page({{ tags: parentTags }}, (req, res) => {{
+  const user = req.session.user;
+  if (!user || user.role !== 'parent') return res.render('page', {{ title: '{title}', who: '{who}' }});
+  const kids = children.all(user.id).map((c) => ({{ ...c, attendance: attendanceFor(c.id) }}));
+  res.render('page', {{ title: '{title}', who: '{who}', user, children: kids }});
+}}));
+""",
+}
+
+# views/page.ejs: every router's home renders it (dashboards pass `attendance`
+# for a student or `children` for a parent). Written only if missing.
+PAGE_EJS = r"""<!doctype html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <meta name="viewport" content="width=device-width,initial-scale=1">
+  <title><%= title %> • <%= siteName %></title>
+  <link rel="stylesheet" href="/style.css">
+</head>
+<body>
+  <main class="container">
+    <h1><%= title %></h1>
+    <p><%= who %><% if (locals.user) { %> · signed in as <%= user.name %><% } %></p>
+<%
+  const summaries = locals.attendance
+    ? [{ name: 'Attendance', attendance }]
+    : (locals.children || []).map((c) => ({ name: c.class_name ? `${c.name} (${c.class_name})` : c.name, attendance: c.attendance }));
+%>
+<% for (const s of summaries) { %>
+    <section class="card">
+      <h2><%= s.name %></h2>
+      <p>Since <%= s.attendance.since %>:
+<% for (const [status, n] of Object.entries(s.attendance.counts)) { %>
+        <span class="pill"><%= status %>: <%= n %></span>
+<% } %>
+      </p>
+      <table class="table">
+        <thead><tr><th>Date</th><th>Status</th></tr></thead>
+        <tbody>
+<% for (const r of s.attendance.recent) { %>
+          <tr><td><%= r.date %></td><td><%= r.status %></td></tr>
+<% } %>
+        </tbody>
+      </table>
+    </section>
+<% } %>
+  </main>
+</body>
+</html>
 """
 
-# 1) Write/overwrite each route file
-written = []
-for fname, title, who in routes:
-    js_path = os.path.join(ROUTES_DIR, f"{fname}.js")
-    with open(js_path, "w", encoding="utf-8") as f:
-        f.write(TEMPLATE.format(service=fname, title=title, who=who))
-    written.append(js_path)
+# src/utils/validate.js: request-value checks shared by the routers
+VALIDATE_JS = r"""// src/utils/validate.js
+// Request-value checks shared by the route files.
+
+// YYYY-MM-DD naming a real day: Date.parse alone accepts 2025-02-30
+function isDate(s) {
+  if (typeof s !== 'string') return false;
+  const d = new Date(`${s}T00:00:00Z`);
+  return !Number.isNaN(d.getTime()) && d.toISOString().slice(0, 10) === s;
+}
+
+module.exports = { isDate };
+"""
+
+# Router-specific handlers, inserted before module.exports
+EXTRAS = {
+    "admin": """
+const db = require('../../db');
+const exporter = require('../utils/export');
+const profiler = require('../utils/profiler');
+const { isDate } = require('../utils/validate');
+
+function requireAdmin(req, res, next) {
+  if (req.session.user && req.session.user.role === 'admin') return next();
+  res.status(403).json({ error: 'Admin only' });
+}
 
-# 2) Patch server.js to require + mount routers (idempotent)
+// Streaming exports (export_data.py): /admin/export/attendance.csv?from=&to=&class=
+router.get('/export/:kind.:format', requireAdmin, exporter.handler(db));
+
+// Dashboard numbers from the trigger-maintained counters (counters.py): one
+// primary-key read for everything except attendance history, plus one day of it
+const readCounters = db.prepare(`
+  SELECT name, value FROM counters
+  WHERE name >= 'attendance;' OR (name >= ? AND name < ?)
+`);
+
+function today() {
+  const d = new Date();
+  return new Date(d.getTime() - d.getTimezoneOffset() * 60000).toISOString().slice(0, 10);
+}
+
+// GET /admin/overview?date=YYYY-MM-DD (default: today)
+router.get('/overview', requireAdmin, (req, res) => {
+  const date = isDate(req.query.date) ? req.query.date : today();
+  const day = `attendance:${date}:`;
+  const out = { date, users: {}, jobs: 0, applications: 0, applicationsByJob: {}, attendance: {} };
+  for (const { name, value } of readCounters.all(day, `${day}\\uffff`)) {
+    const parts = name.split(':');
+    if (!value) continue;
+    if (parts[0] === 'users') out.users[parts[2]] = value;
+    else if (name === 'jobs') out.jobs = value;
+    else if (name === 'job_apps') out.applications = value;
+    else if (parts[0] === 'job_apps') out.applicationsByJob[parts[2]] = value;
+    else if (parts[0] === 'attendance') out.attendance[parts[2]] = value;
+  }
+  res.json(out);
+});
+
+// On-demand CPU/heap profiles (PROFILING_ENABLED=true): /admin/profile/cpu?seconds=10
+router.use('/profile', requireAdmin, profiler.router());
+""",
+    "teacher": """
+const db = require('../../db');
+const pagecache = require('../utils/pagecache');
+const { isDate } = require('../utils/validate');
+
+const STATUSES = new Set(['present', 'absent', 'late', 'excused']);
+const MAX_RECORDS = 2000;
+
+function requireTeacher(req, res, next) {
+  const role = req.session.user && req.session.user.role;
+  if (role === 'teacher' || role === 'admin') return next();
+  res.status(403).json({ error: 'Teachers only' });
+}
+
+const upsertAttendance = db.prepare(`
+  INSERT INTO attendance (student_id, date, status) VALUES (?, ?, ?)
+  ON CONFLICT (student_id, date) DO UPDATE SET status = excluded.status
+`);
+// One query validates the whole roster (optionally limited to one class)
+const knownStudents = db.prepare(`
+  SELECT id FROM users
+  WHERE role = 'student' AND id IN (SELECT value FROM json_each(?))
+    AND (? IS NULL OR class_name = ?)
+`).pluck();
+const saveRoll = db.transaction((date, records) => {
+  for (const r of records) upsertAttendance.run(r.student_id, date, r.status);
+});
+
+// Whole-class roll call in one request and one transaction:
+// POST /teacher/attendance/bulk { date, class_name?, records: [{ student_id, status }] }
+router.post('/attendance/bulk', requireTeacher, (req, res) => {
+  const { date, class_name: className = null, records } = req.body || {};
+  const errors = [];
+  if (!isDate(date)) errors.push('date must be a real day as YYYY-MM-DD');
+  if (className !== null && typeof className !== 'string') errors.push('class_name must be a string or null');
+  if (!Array.isArray(records) || !records.length) errors.push('records must be a non-empty array');
+  else if (records.length > MAX_RECORDS) errors.push(`at most ${MAX_RECORDS} records per request`);
+  if (errors.length) return res.status(400).json({ errors });
+
+  const seen = new Set();
+  records.forEach((r, i) => {
+    if (!r || !Number.isInteger(r.student_id)) errors.push(`records[${i}].student_id must be an integer`);
+    else if (seen.has(r.student_id)) errors.push(`records[${i}]: duplicate student_id ${r.student_id}`);
+    else seen.add(r.student_id);
+    if (!r || !STATUSES.has(r.status)) errors.push(`records[${i}].status must be one of ${[...STATUSES].join(', ')}`);
+  });
+  if (errors.length) return res.status(400).json({ errors });
+
+  const found = new Set(knownStudents.all(JSON.stringify([...seen]), className, className));
+  const unknown = [...seen].filter((id) => !found.has(id));
+  if (unknown.length) {
+    return res.status(400).json({ errors: [`unknown student_id(s)${className ? ` in ${className}` : ''}: ${unknown.join(', ')}`] });
+  }
+
+  saveRoll(date, records);
+  pagecache.invalidate(records.map((r) => `student:${r.student_id}`));
+  res.json({ ok: true, date, saved: records.length });
+});
+""",
+}
+
+def render_routes():
+    """[(relative path, content)] for every router in the manifest."""
+    return [
+        (os.path.join("src", "routes", f"{fname}.js"),
+         TEMPLATE.format(service=fname, title=title, who=who, extra=EXTRAS.get(fname, ""),
+                         home=HOMES.get(fname, DEFAULT_HOME).format(title=title, who=who, attendance=ATTENDANCE_SUMMARY)))
+        for fname, title, who in routes
+    ]
+
+# server.js require + mount blocks (idempotent)
 require_block = """\
 // === ROUTERS ADDED BY PY SCRIPT ===
 const adminRouter = require('./src/routes/admin');
@@ -96,10 +324,40 @@ def patch_server_js():
     else:
         print("server.js already contains router requires/mounts; no changes made.")
 
-patch_server_js()
+def main():
+    # 1) Write/overwrite each route file
+    os.makedirs(ROUTES_DIR, exist_ok=True)
+    written = []
+    for rel, content in render_routes():
+        js_path = os.path.join(PROJECT_ROOT, rel)
+        with open(js_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        written.append(js_path)
+
+    # Helpers the routes require (src/utils/validate.js)
+    validate_path = os.path.join(PROJECT_ROOT, "src", "utils", "validate.js")
+    os.makedirs(os.path.dirname(validate_path), exist_ok=True)
+    with open(validate_path, "w", encoding="utf-8") as f:
+        f.write(VALIDATE_JS)
+    written.append(validate_path)
+
+    # 2) Shared dashboard view (kept if you've customised it)
+    view_path = os.path.join(PROJECT_ROOT, "views", "page.ejs")
+    if not os.path.exists(view_path):
+        os.makedirs(os.path.dirname(view_path), exist_ok=True)
+        with open(view_path, "w", encoding="utf-8") as f:
+            f.write(PAGE_EJS)
+        written.append(view_path)
+
+    # 3) Patch server.js to require + mount routers (idempotent)
+    patch_server_js()
+
+    print("\nFiles written:")
+    for p in written:
+        print(" -", os.path.relpath(p, PROJECT_ROOT))
 
-print("\nRoutes written:")
-for p in written:
-    print(" -", os.path.relpath(p, PROJECT_ROOT))
+    print("\nDone. Now run:\n  npm run dev\n\nThen test:\n  curl http://127.0.0.1:3000/admin/health\n  curl http://127.0.0.1:3000/teacher/health\n  curl http://127.0.0.1:3000/student/health\n  curl http://127.0.0.1:3000/parent/health\n  curl http://127.0.0.1:3000/jobs/health\n"
+          "  (admin session) /admin/export/attendance.csv?from=2025-01-01&to=2025-07-31\n")
 
-print("\nDone. Now run:\n  npm run dev\n\nThen test:\n  curl http://127.0.0.1:3000/admin/health\n  curl http://127.0.0.1:3000/teacher/health\n  curl http://127.0.0.1:3000/student/health\n  curl http://127.0.0.1:3000/parent/health\n  curl http://127.0.0.1:3000/jobs/health\n")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
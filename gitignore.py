@@ -40,6 +40,19 @@ Thumbs.db
 dist/
 build/
 
+# ---- Local data (SQLite DB + backup_db.py snapshots) ----
+data.sqlite*
+backups/
+
+# ---- Profiles (make_profiler.py) ----
+profiles/
+
+# ---- Compiled config (make_config.py; holds .env secrets) ----
+src/config.js
+
+# ---- Docs build manifest (make_docs.py) ----
+.docs-build.json
+
 # ---- Backups & temp ----
 *.bak
 *.tmp
@@ -0,0 +1,303 @@
+# make_config.py
+# Validates .env against the portal's config schema and writes src/config.js.
+#
+# Every setting the generated server reads lives in SCHEMA below, with its type,
+# default and allowed range. The build step parses .env, rejects bad values
+# (SQLITE_CACHE_MB=abc used to fall back to the default without a word), warns
+# about unknown keys (typos such as WEB_CONCURENCY), and bakes the result into
+# a frozen module. server.js, db.js and src/utils/* read `config.X` instead of
+# process.env.
+#
+# Usage:
+#   python make_config.py              # .env in cwd -> src/config.js
+#   python make_config.py /path/to/app
+#   python make_config.py --check      # validate only, exit 1 on errors
+#
+# Precedence at startup: real environment variables (PORT from a host,
+# DB_PATH from run_integration.py) > values baked from .env > schema defaults.
+# Overrides are checked against the same rules. src/config.js records a hash
+# of .env and refuses to load if .env changed since the build.
+
+import argparse
+import difflib
+import hashlib
+import json
+import os
+import re
+import sys
+
+# ---------- schema ----------
+def setting(type_, default, min=None, max=None, choices=None, secret=False, prod_required=False, doc=""):
+    spec = {"type": type_, "default": default, "doc": doc}
+    if min is not None:
+        spec["min"] = min
+    if max is not None:
+        spec["max"] = max
+    if choices:
+        spec["choices"] = list(choices)
+    if secret:
+        spec["secret"] = True
+    if prod_required:
+        spec["prodRequired"] = True
+    return spec
+
+# name -> spec; grouped like .env.example
+SCHEMA = {
+    # Server
+    "PORT": setting("int", 3000, 1, 65535),
+    "NODE_ENV": setting("enum", "development", choices=("development", "production", "test")),
+    "SITE_NAME": setting("str", "School Portal"),
+    "BASE_URL": setting("str", "http://localhost:3000", doc="links in emails"),
+    "SESSION_SECRET": setting("str", "dev-session-secret", secret=True, prod_required=True),
+    "SESSION_STORE": setting("enum", "sqlite", choices=("sqlite", "memory"), doc="memory = one worker"),
+    "TRUST_PROXY": setting("str", "", doc="empty = no proxy; hop count, loopback or proxy IPs/subnets"),
+    "DB_PATH": setting("str", "", doc="empty = data.sqlite next to db.js"),
+    # Initial admin (npm run seed)
+    "ADMIN_EMAIL": setting("str", ""),
+    "ADMIN_PASSWORD": setting("str", "", secret=True),
+    "ADMIN_PIN": setting("str", "", secret=True),
+    # Email / SMS
+    "SMTP_HOST": setting("str", "", doc="empty = log messages instead of sending"),
+    "SMTP_PORT": setting("int", 465, 1, 65535),
+    "SMTP_SECURE": setting("bool", True),
+    "SMTP_USER": setting("str", ""),
+    "SMTP_PASS": setting("str", "", secret=True),
+    "FROM_EMAIL": setting("str", ""),
+    "TWILIO_ACCOUNT_SID": setting("str", ""),
+    "TWILIO_AUTH_TOKEN": setting("str", "", secret=True),
+    "TWILIO_FROM": setting("str", ""),
+    # Performance profile (make_env.py)
+    "PERF_PROFILE": setting("str", "", doc="informational"),
+    "WEB_CONCURRENCY": setting("int", 1, 1, 64),
+    "SQLITE_CACHE_MB": setting("int", 16, 1, 4096),
+    "SQLITE_MMAP_MB": setting("int", 0, 0, 65536),
+    "MAX_CONNECTIONS": setting("int", 256, 1, 100000),
+    "LISTEN_BACKLOG": setting("int", 511, 1, 65535),
+    "COMPRESSION_THRESHOLD": setting("int", 1024, 0, 10 * 1024 * 1024),
+    "KEEP_ALIVE_TIMEOUT_MS": setting("int", 5000, 1000, 600000),
+    "HEADERS_TIMEOUT_MS": setting("int", 20000, 1000, 600000),
+    "REQUEST_TIMEOUT_MS": setting("int", 120000, 0, 3600000, doc="0 = no limit"),
+    "SHUTDOWN_TIMEOUT_MS": setting("int", 10000, 100, 600000),
+    # Instrumentation
+    "METRICS_ENABLED": setting("bool", False),
+    "METRICS_TOKEN": setting("str", "", secret=True, doc="bearer token for /metrics; empty = closed"),
+    "PROFILING_ENABLED": setting("bool", False),
+    "PROFILE_DIR": setting("str", "profiles", doc="relative to the project directory"),
+    # Health probes
+    "HEALTH_INTERVAL_MS": setting("int", 15000, 100, 3600000),
+    "HEALTH_TIMEOUT_MS": setting("int", 2000, 50, 60000),
+    "HEALTH_SMTP_INTERVAL_MS": setting("int", 300000, 1000, 86400000),
+    # Rate limits
+    "RATE_LIMIT_AUTH_PER_MIN": setting("int", 10, 1, 10000),
+    "RATE_LIMIT_AUTH_PER_MIN_IP": setting("int", 120, 1, 100000, doc="one school NAT = one IP"),
+    "RATE_LIMIT_PIN_PER_MIN": setting("int", 5, 1, 10000),
+    "RATE_LIMIT_PIN_PER_MIN_IP": setting("int", 60, 1, 100000),
+    "RATE_LIMIT_MAX_KEYS": setting("int", 50000, 100, 10000000),
+    # Dashboard page cache
+    "PAGE_CACHE_MB": setting("int", 8, 0, 4096, doc="0 = off"),
+    "PAGE_CACHE_MAX_ENTRIES": setting("int", 5000, 0, 10000000),
+    "PAGE_CACHE_TTL_SEC": setting("int", 300, 1, 86400),
+}
+
+TRUE = {"1", "true", "yes", "on"}
+FALSE = {"0", "false", "no", "off"}
+WEAK_SECRETS = {"", "dev-session-secret", "replace_with_a_long_random_string"}
+
+# ---------- .env parsing + validation ----------
+def parse_env(text):
+    """dotenv-style KEY=VALUE lines -> [(line number, key, value)]."""
+    out = []
+    for n, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("export "):
+            line = line[7:].lstrip()
+        key, sep, value = line.partition("=")
+        if not sep:
+            out.append((n, line, None))
+            continue
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+            value = value[1:-1].replace("\\n", "\n") if value[0] == '"' else value[1:-1]
+        elif " #" in value:
+            value = value.split(" #", 1)[0].rstrip()
+        out.append((n, key.strip(), value))
+    return out
+
+def coerce(name, raw):
+    """Typed value, or raises ValueError with a message naming the setting."""
+    spec = SCHEMA[name]
+    kind = spec["type"]
+    if kind == "int":
+        if not re.fullmatch(r"[-+]?\d+", raw.strip()):
+            raise ValueError(f"{name}={raw!r} is not a whole number")
+        value = int(raw)
+        if "min" in spec and value < spec["min"] or "max" in spec and value > spec["max"]:
+            raise ValueError(f"{name}={value} is outside {spec.get('min', '-inf')}..{spec.get('max', 'inf')}")
+        return value
+    if kind == "bool":
+        if raw.lower() in TRUE:
+            return True
+        if raw.lower() in FALSE:
+            return False
+        raise ValueError(f"{name}={raw!r} is not a boolean (true/false)")
+    if kind == "enum" and raw not in spec["choices"]:
+        raise ValueError(f"{name}={raw!r} must be one of {', '.join(spec['choices'])}")
+    return raw
+
+def validate(pairs):
+    """(values, errors, warnings) for parsed .env pairs over the schema defaults."""
+    values = {name: spec["default"] for name, spec in SCHEMA.items()}
+    errors, warnings = [], []
+    for n, key, raw in pairs:
+        if raw is None:
+            errors.append(f"line {n}: expected KEY=VALUE, got {key!r}")
+        elif key not in SCHEMA:
+            close = difflib.get_close_matches(key, SCHEMA, n=1)
+            warnings.append(f"line {n}: unknown setting {key}" + (f" (did you mean {close[0]}?)" if close else ""))
+        elif raw == "" and SCHEMA[key]["type"] != "str":
+            continue  # KEY= means "use the default"
+        else:
+            try:
+                values[key] = coerce(key, raw)
+            except ValueError as e:
+                errors.append(f"line {n}: {e}")
+    if values["NODE_ENV"] == "production":
+        for name, spec in SCHEMA.items():
+            if spec.get("prodRequired") and values[name] in WEAK_SECRETS:
+                errors.append(f"{name} must be set to a real value when NODE_ENV=production")
+    return values, errors, warnings
+
+# ---------- src/config.js ----------
+CONFIG_JS = r"""// src/config.js — generated by make_config.py from .env; do not edit.
+// Rebuild with `python make_config.py` after changing .env.
+// Loaded once at startup; everything else reads this frozen object.
+const crypto = require('crypto');
+const fs = require('fs');
+const path = require('path');
+
+const SCHEMA = __SCHEMA__;
+const BUILT = __BUILT__;
+const ENV_SHA256 = '__SHA__';
+const WEAK_SECRETS = __WEAK__;
+
+// Same rules as make_config.coerce
+function coerce(name, raw) {
+  const spec = SCHEMA[name];
+  if (spec.type === 'int') {
+    if (!/^[-+]?\d+$/.test(raw.trim())) throw new Error(`${name}=${JSON.stringify(raw)} is not a whole number`);
+    const value = Number(raw);
+    if ((spec.min !== undefined && value < spec.min) || (spec.max !== undefined && value > spec.max)) {
+      throw new Error(`${name}=${value} is outside ${spec.min}..${spec.max}`);
+    }
+    return value;
+  }
+  if (spec.type === 'bool') {
+    if (/^(1|true|yes|on)$/i.test(raw)) return true;
+    if (/^(0|false|no|off)$/i.test(raw)) return false;
+    throw new Error(`${name}=${JSON.stringify(raw)} is not a boolean (true/false)`);
+  }
+  if (spec.type === 'enum' && !spec.choices.includes(raw)) {
+    throw new Error(`${name}=${JSON.stringify(raw)} must be one of ${spec.choices.join(', ')}`);
+  }
+  return raw;
+}
+
+function load() {
+  let sha = '';
+  try {
+    sha = crypto.createHash('sha256').update(fs.readFileSync(path.join(__dirname, '..', '.env'))).digest('hex');
+  } catch {
+    // no .env: environment variables and defaults only
+  }
+  if (sha !== ENV_SHA256) {
+    throw new Error('.env changed since src/config.js was built; run `python make_config.py`');
+  }
+
+  const config = { ...BUILT };
+  const errors = [];
+  for (const name of Object.keys(SCHEMA)) {
+    const raw = process.env[name];
+    if (raw === undefined || (raw === '' && SCHEMA[name].type !== 'str')) continue;
+    try {
+      config[name] = coerce(name, raw);
+    } catch (e) {
+      errors.push(`environment: ${e.message}`);
+    }
+  }
+  if (config.NODE_ENV === 'production') {
+    for (const [name, spec] of Object.entries(SCHEMA)) {
+      if (spec.prodRequired && WEAK_SECRETS.includes(config[name])) {
+        errors.push(`${name} must be set to a real value when NODE_ENV=production`);
+      }
+    }
+  }
+  if (errors.length) throw new Error(`Invalid configuration:\n  ${errors.join('\n  ')}`);
+  return Object.freeze(config);
+}
+
+module.exports = load();
+"""
+
+def render_config(values, env_sha):
+    rules = {name: {k: v for k, v in spec.items() if k in ("type", "min", "max", "choices", "prodRequired")}
+             for name, spec in SCHEMA.items()}
+    return (CONFIG_JS
+            .replace("__SCHEMA__", json.dumps(rules, indent=2))
+            .replace("__BUILT__", json.dumps(values, indent=2))
+            .replace("__SHA__", env_sha)
+            .replace("__WEAK__", json.dumps(sorted(WEAK_SECRETS))))
+
+def read_env(path):
+    """(text, sha256) of an env file; ('', '') if it doesn't exist."""
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return "", ""
+    return raw.decode("utf-8"), hashlib.sha256(raw).hexdigest()
+
+def compile_env(env_path):
+    """src/config.js content for an env file; raises ValueError if it's invalid."""
+    text, sha = read_env(env_path)
+    values, errors, _ = validate(parse_env(text))
+    if errors:
+        raise ValueError("; ".join(errors))
+    return render_config(values, sha)
+
+def build(target, check_only=False):
+    """Validate target/.env; write target/src/config.js. Returns True on success."""
+    env_path = os.path.join(target, ".env")
+    text, sha = read_env(env_path)
+    values, errors, warnings = validate(parse_env(text))
+    for w in warnings:
+        print(f"! .env {w}")
+    for e in errors:
+        print(f"❌ .env {e}")
+    if errors:
+        return False
+    if not sha:
+        print("• No .env found; using schema defaults (run python make_env.py)")
+    if check_only:
+        print(f"✅ .env valid ({len(SCHEMA)} settings)")
+        return True
+    out = os.path.join(target, "src", "config.js")
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    # Holds the same secrets as .env: owner-only, and gitignored
+    fd = os.open(out + ".tmp", os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(render_config(values, sha))
+    os.replace(out + ".tmp", out)
+    print(f"✓ Wrote {os.path.relpath(out)} ({len(SCHEMA)} settings)")
+    return True
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Validate .env and compile src/config.js")
+    ap.add_argument("target", nargs="?", default=os.getcwd(), help="project directory (default: cwd)")
+    ap.add_argument("--check", action="store_true", help="validate only")
+    args = ap.parse_args(argv)
+    sys.exit(0 if build(os.path.abspath(args.target), args.check) else 1)
+
+if __name__ == "__main__":
+    main()
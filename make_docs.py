@@ -0,0 +1,705 @@
+# make_docs.py
+# Builds the static docs site (docs/) and README.md from one source.
+#
+# Page bodies, the stylesheet and the nav live below; the guide page is
+# rendered from readme.py's `lines`, which are also written to README.md, so
+# the README text exists once. Every page is self-contained for a single round
+# trip on slow mobile links:
+#   - only the CSS rules a page can match are inlined in a <style> tag
+#     (no stylesheet request); the web font loads without blocking render
+#   - HTML is minified; the nav and the guide's table of contents are baked in
+#   - docs/search.json (fetched on first focus of the search box) holds a
+#     precomputed term -> section index for client-side search
+#
+# Builds are incremental: .docs-build.json records a hash of each output's
+# sources (and of the file written), and only outputs whose sources changed, or
+# that were edited or deleted by hand, are rendered and rewritten. A page that
+# gzips past ~14 KiB (one TCP initial window) is flagged.
+#
+# Usage:
+#   python make_docs.py              # build into current directory
+#   python make_docs.py /path/to/app
+#   python make_docs.py --force      # ignore the build manifest, render everything
+
+import argparse
+import gzip
+import hashlib
+import html
+import json
+import os
+import re
+
+from readme import lines as README_LINES
+
+# Bump when the renderer changes, so every page is rebuilt once
+BUILD_VERSION = 1
+MANIFEST = ".docs-build.json"
+ROUND_TRIP_BYTES = 14 * 1024
+
+SITE_NAME = "School Portal Upgrade"
+FONT_CSS = "https://fonts.googleapis.com/css2?family=Inter:wght@300;500;700&display=swap"
+
+# ---------- sources ----------
+STYLES_CSS = r""":root{
+  --bg1:#ffffff; --bg2:#ffffff;
+  --accent:#1877f2; --accent2:#4267b2;
+  --text:#050505; --muted:#606770;
+  --card:#ffffff; --stroke:#dde1e7;
+  --shadow:0 6px 20px rgba(0,0,0,.06);
+  --radius:14px;
+}
+
+*{box-sizing:border-box}
+html,body{height:100%}
+body{
+  margin:0; font-family:Inter,system-ui,-apple-system,Segoe UI,Roboto,Arial,sans-serif;
+  color:var(--text);
+  background:linear-gradient(180deg, var(--bg1), var(--bg2));
+}
+
+/* NAV */
+.nav{
+  display:flex; align-items:center; justify-content:space-between; flex-wrap:wrap; gap:10px;
+  padding:14px 22px; border-bottom:1px solid var(--stroke);
+  position:sticky; top:0; z-index:10;
+  background:#ffffff; backdrop-filter:saturate(120%) blur(4px);
+}
+.nav-actions{display:flex; gap:8px; flex-wrap:wrap}
+.brand{font-weight:700; letter-spacing:.3px; color:var(--text); text-decoration:none}
+.brand span{color:var(--accent)}
+.nav-actions .btn[aria-current]{border-color:var(--accent); color:var(--accent)}
+
+/* SEARCH */
+.search{position:relative; flex:1 1 180px; max-width:320px}
+.search .input{padding:9px 12px}
+.results{
+  position:absolute; left:0; right:0; top:calc(100% + 6px); margin:0; padding:6px;
+  list-style:none; background:var(--card); border:1px solid var(--stroke);
+  border-radius:12px; box-shadow:var(--shadow); max-height:60vh; overflow:auto;
+}
+.results a{display:block; padding:8px 10px; border-radius:8px; color:var(--text); text-decoration:none}
+.results a:hover,.results a:focus{background:#f0f2f5}
+.results small{display:block; color:var(--muted)}
+
+/* LAYOUT */
+.container{max-width:1080px; margin:0 auto; padding:34px 18px}
+.hero{text-align:center; margin:24px 0 32px}
+h1{
+  font-size:clamp(28px,4vw,46px); line-height:1.05; margin:0 0 8px;
+  background:linear-gradient(90deg, var(--accent), var(--accent2));
+  -webkit-background-clip:text; background-clip:text; color:transparent;
+}
+.subtitle{color:var(--muted); margin:0 auto 18px; max-width:720px}
+
+/* BUTTONS */
+.actions{display:flex; gap:12px; justify-content:center; flex-wrap:wrap}
+.btn{
+  padding:10px 16px; border-radius:12px; border:1px solid var(--stroke);
+  background:#ffffff; color:var(--text); text-decoration:none;
+  display:inline-flex; align-items:center; gap:8px; box-shadow:var(--shadow);
+  transition:transform .2s ease, box-shadow .2s ease;
+}
+.btn:hover{transform:translateY(-2px)}
+.btn.primary{
+  background:linear-gradient(135deg, var(--accent), var(--accent2));
+  color:#ffffff; font-weight:700; border:none;
+}
+.btn.full{width:100%; justify-content:center; margin-top:8px}
+
+/* CARDS & GRID */
+.grid{display:grid; grid-template-columns:repeat(auto-fit,minmax(240px,1fr)); gap:16px; margin:28px 0}
+.card{
+  background:var(--card); border:1px solid var(--stroke); border-radius:var(--radius);
+  padding:18px; box-shadow:var(--shadow)
+}
+.card h3{margin:0 0 6px}
+.card p{margin:0; color:var(--muted)}
+
+/* TABLE */
+.table{width:100%; border-collapse:collapse; overflow:hidden; border-radius:12px}
+.table th,.table td{padding:12px 14px; text-align:left; border-bottom:1px solid var(--stroke)}
+.table thead th{background:#f6f7f9; font-weight:600}
+.pill{padding:6px 10px; border-radius:999px; font-size:.85rem}
+.pill.ok{background:#e8f6ee; color:#1f8b4c}
+.pill.warn{background:#fff8db; color:#9a7b04}
+
+/* GUIDE (README) */
+.guide{display:grid; grid-template-columns:220px minmax(0,1fr); gap:28px; align-items:start}
+.toc{position:sticky; top:84px; font-size:.92rem}
+.toc ol{margin:0; padding:0 0 0 18px}
+.toc a{color:var(--muted); text-decoration:none; line-height:1.9}
+.toc a:hover{color:var(--accent)}
+.doc h2{margin:32px 0 10px; padding-bottom:6px; border-bottom:1px solid var(--stroke)}
+.doc li{margin:4px 0; line-height:1.55}
+.doc code{font-family:ui-monospace,Menlo,Consolas,monospace; font-size:.88em; background:#f0f2f5; padding:1px 5px; border-radius:6px}
+.doc pre{background:#f6f7f9; border:1px solid var(--stroke); border-radius:12px; padding:14px; overflow:auto}
+.doc pre code{background:none; padding:0}
+@media (max-width:760px){
+  .guide{grid-template-columns:1fr}
+  .toc{position:static}
+}
+
+/* FOOTER */
+.footer{color:var(--muted); text-align:center; padding:28px}
+
+/* ---- Auth / Form styles ---- */
+.auth-wrap{display:grid; place-items:center; min-height:70vh}
+.auth-card{
+  width:min(440px, 92%); background:var(--card); border:1px solid var(--stroke);
+  border-radius:var(--radius); padding:24px; box-shadow:var(--shadow)
+}
+.auth-title{margin:0 0 6px; font-size:clamp(22px,3.2vw,28px)}
+.auth-subtitle{margin:0 0 18px; color:var(--muted)}
+.field{display:block; margin:0 0 14px}
+.label{display:block; font-size:.9rem; color:var(--muted); margin:0 0 6px}
+.input{
+  width:100%; padding:12px 14px; border-radius:12px; border:1px solid var(--stroke);
+  background:#ffffff; color:var(--text); outline:none;
+  transition:border-color .2s ease, box-shadow .2s ease;
+}
+.input::placeholder{color:#98a1ab}
+.input:focus{border-color:#b9d3ff; box-shadow:0 0 0 4px rgba(24,119,242,.15)}
+.row{display:flex; align-items:center; gap:8px}
+.between{justify-content:space-between}
+.checkbox{display:flex; align-items:center; gap:8px; color:var(--muted); font-size:.92rem}
+.tiny-link{color:var(--accent); text-decoration:none}
+.tiny-link:hover{text-decoration:underline}
+.auth-note{color:var(--muted); text-align:center; margin:12px 0 0}
+.select{
+  appearance:none; background:#fff url('data:image/svg+xml;utf8,<svg xmlns="http://www.w3.org/2000/svg" width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="%23606770" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><polyline points="6 9 12 15 18 9"/></svg>') no-repeat right 12px center;
+  padding-right:40px;
+}
+.help{margin:4px 0 0; font-size:.9rem; color:#6b7280}
+"""
+
+HOME_BODY = r"""
+<header class="hero">
+  <h1>Welcome to the School Portal</h1>
+  <p class="subtitle">Fast. Modern. Secure. Built for administrators, teachers, parents and students.</p>
+  <div class="actions">
+    <a class="btn primary" href="register.html">Get Started</a>
+    <a class="btn" href="login.html">Login</a>
+  </div>
+</header>
+
+<!-- Features -->
+<section class="grid">
+  <article class="card">
+    <h3>Results &amp; Transcripts</h3>
+    <p>Generate and share results with one click. Export to PDF and CSV.</p>
+  </article>
+  <article class="card">
+    <h3>Attendance</h3>
+    <p>Real-time class attendance with analytics and bulk import.</p>
+  </article>
+  <article class="card">
+    <h3>Fees &amp; Invoices</h3>
+    <p>Track payments, send reminders, and reconcile instantly.</p>
+  </article>
+</section>
+"""
+
+LOGIN_BODY = r"""
+<section class="auth-wrap">
+  <div class="auth-card">
+    <h2 class="auth-title">Login to your account</h2>
+    <p class="auth-subtitle">Welcome back, please sign in</p>
+
+    <form class="auth-form" action="#" method="post" autocomplete="on">
+      <label class="field">
+        <span class="label">Email or Username</span>
+        <input class="input" type="text" name="username" placeholder="e.g. ada.obi@school.ng" required>
+      </label>
+
+      <label class="field">
+        <span class="label">Password</span>
+        <input class="input" type="password" name="password" placeholder="••••••••" required>
+      </label>
+
+      <div class="row between">
+        <label class="checkbox">
+          <input type="checkbox" name="remember"> <span>Remember me</span>
+        </label>
+        <a class="tiny-link" href="#">Forgot password?</a>
+      </div>
+
+      <button class="btn primary full" type="submit">Login</button>
+    </form>
+
+    <p class="auth-note">No account? <a class="tiny-link" href="register.html">Create one</a></p>
+  </div>
+</section>
+"""
+
+REGISTER_BODY = r"""
+<section class="auth-wrap">
+  <div class="auth-card" role="form" aria-labelledby="reg-title">
+    <h2 id="reg-title" class="auth-title">Create your account</h2>
+    <p class="auth-subtitle">Join the portal to manage academics with ease</p>
+
+    <form class="auth-form" action="#" method="post" autocomplete="on" onsubmit="return checkPasswords(event)">
+      <label class="field">
+        <span class="label">Full Name</span>
+        <input class="input" type="text" name="full_name" placeholder="e.g. Adaobi Okeke" required>
+      </label>
+
+      <label class="field">
+        <span class="label">Email</span>
+        <input class="input" type="email" name="email" placeholder="e.g. ada.obi@school.ng" required>
+      </label>
+
+      <label class="field">
+        <span class="label">Phone (optional)</span>
+        <input class="input" type="tel" name="phone" placeholder="+234 801 234 5678">
+      </label>
+
+      <label class="field">
+        <span class="label">Role</span>
+        <select class="input select" name="role" required>
+          <option value="">Select your role</option>
+          <option>Student</option>
+          <option>Parent/Guardian</option>
+          <option>Teacher</option>
+          <option>Admin</option>
+        </select>
+      </label>
+
+      <label class="field">
+        <span class="label">Password</span>
+        <input class="input" id="pw1" type="password" name="password" placeholder="••••••••" minlength="6" required>
+      </label>
+
+      <label class="field">
+        <span class="label">Confirm Password</span>
+        <input class="input" id="pw2" type="password" name="password2" placeholder="••••••••" minlength="6" required>
+      </label>
+
+      <p id="pwHelp" class="help" aria-live="polite"></p>
+
+      <label class="checkbox" style="margin:10px 0 6px">
+        <input type="checkbox" required>
+        <span>I agree to the Terms &amp; Privacy</span>
+      </label>
+
+      <button class="btn primary full" type="submit">Create account</button>
+    </form>
+
+    <p class="auth-note">Already have an account? <a class="tiny-link" href="login.html">Log in</a></p>
+  </div>
+</section>
+"""
+
+REGISTER_JS = r"""
+function checkPasswords(e){
+  const p1 = document.getElementById('pw1');
+  const p2 = document.getElementById('pw2');
+  const help = document.getElementById('pwHelp');
+  if(p1.value !== p2.value){
+    help.textContent = "Passwords do not match.";
+    help.style.color = "#d93025";
+    p2.focus();
+    e.preventDefault();
+    return false;
+  }
+  help.textContent = "";
+  return true;
+}
+"""
+
+# What SEARCH_JS builds per result (so their CSS rules count as used)
+SEARCH_RESULT_MARKUP = "<li><a><small></small></a></li>"
+
+# Loads search.json on first focus; every page shares it from the HTTP cache
+SEARCH_JS = r"""
+document.getElementById("y").textContent = new Date().getFullYear();
+(function(){
+  const q = document.getElementById('q'), out = document.getElementById('results');
+  let index;
+  const load = () => index || (index = fetch('search.json').then((r) => r.json()));
+  q.addEventListener('focus', load, { once: true });
+  q.addEventListener('input', () => load().then((ix) => {
+    const words = q.value.toLowerCase().match(/[a-z0-9_]+/g) || [];
+    const score = new Map();
+    for (const w of words) {
+      const hit = new Set();
+      for (const term in ix.terms) if (term.startsWith(w)) ix.terms[term].forEach((d) => hit.add(d));
+      for (const d of hit) score.set(d, (score.get(d) || 0) + 1);
+    }
+    const best = [...score].filter(([, s]) => s === words.length).map(([d]) => d).slice(0, 8);
+    out.replaceChildren(...best.map((d) => {
+      const [url, title, snippet] = ix.docs[d];
+      const li = document.createElement('li'), a = document.createElement('a'), small = document.createElement('small');
+      a.href = url; a.textContent = title; small.textContent = snippet;
+      a.append(small); li.append(a);
+      return li;
+    }));
+    out.hidden = !best.length;
+  }));
+})();
+"""
+
+def page(out, title, body=None, markdown=None, description="", script="", nav=None, main_class="container"):
+    return {"out": out, "title": title, "body": body, "markdown": markdown, "description": description,
+            "script": script, "nav": nav, "mainClass": main_class}
+
+# Nav order; `nav` is the button label (None = not in the nav)
+PAGES = [
+    page("index.html", SITE_NAME, HOME_BODY, nav="Home",
+         description="Admin, teacher, student and parent portals for schools."),
+    page("guide.html", f"Guide • {SITE_NAME}", markdown=README_LINES, nav="Guide",
+         description="Install, configure and run the school portal."),
+    page("login.html", f"Login • {SITE_NAME}", LOGIN_BODY, nav="Login"),
+    page("register.html", f"Create Account • {SITE_NAME}", REGISTER_BODY, nav="Register",
+         script=REGISTER_JS),
+]
+
+LAYOUT = """<!doctype html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <meta name="viewport" content="width=device-width,initial-scale=1">
+  <title>{title}</title>
+  {description}
+  <style>{css}</style>
+  <link rel="preconnect" href="https://fonts.googleapis.com">
+  <link rel="stylesheet" href="{font}" media="print" onload="this.media='all'">
+</head>
+<body>
+  <nav class="nav">
+    <a class="brand" href="index.html">School Portal <span>Upgrade</span></a>
+    <div class="search" role="search">
+      <input class="input" id="q" type="search" placeholder="Search docs" aria-label="Search docs" autocomplete="off">
+      <ul class="results" id="results" hidden></ul>
+    </div>
+    <div class="nav-actions">{nav}</div>
+  </nav>
+  <main class="{main_class}">{main}</main>
+  <footer class="footer">© <span id="y"></span> School Portal Upgrade</footer>
+  <script>{script}</script>
+</body>
+</html>
+"""
+
+# ---------- markdown (the subset readme.py uses) ----------
+def slugify(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-") or "section"
+
+def inline(text):
+    parts = re.split(r"(`[^`]*`)", text)
+    out = []
+    for part in parts:
+        if part.startswith("`") and part.endswith("`") and len(part) > 1:
+            out.append(f"<code>{html.escape(part[1:-1])}</code>")
+            continue
+        part = html.escape(part, quote=False)
+        part = re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", part)
+        part = re.sub(r"\[([^\]]+)\]\(([^)\s]+)\)", r'<a class="tiny-link" href="\2">\1</a>', part)
+        out.append(part)
+    return "".join(out)
+
+def render_markdown(lines):
+    """Returns (html, [(level, id, text)]) for headings, fences, lists, hr and paragraphs."""
+    out, headings, para, items = [], [], [], []
+
+    def flush():
+        if para:
+            out.append(f"<p>{inline(' '.join(para))}</p>")
+            para.clear()
+        if items:
+            out.append("<ul>" + "".join(f"<li>{inline(' '.join(i))}</li>" for i in items) + "</ul>")
+            items.clear()
+
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if line.startswith("```"):
+            flush()
+            code = []
+            i += 1
+            while i < len(lines) and not lines[i].startswith("```"):
+                code.append(lines[i])
+                i += 1
+            out.append(f"<pre><code>{html.escape(chr(10).join(code))}</code></pre>")
+        elif m := re.match(r"(#{1,6})\s+(.*)", line):
+            flush()
+            level, text = len(m.group(1)), m.group(2).strip()
+            hid = slugify(text)
+            headings.append((level, hid, text))
+            out.append(f'<h{level} id="{hid}">{inline(text)}</h{level}>')
+        elif line.strip() == "---":
+            flush()
+            out.append("<hr>")
+        elif m := re.match(r"[-*]\s+(.*)", line):
+            if para:
+                flush()
+            items.append([m.group(1)])
+        elif line.startswith("  ") and items:
+            items[-1].append(line.strip())
+        elif not line.strip():
+            flush()
+        else:
+            if items:
+                flush()
+            para.append(line.strip())
+        i += 1
+    flush()
+    return "\n".join(out), headings
+
+# ---------- CSS: parse, prune to the rules a page uses, minify ----------
+def strip_comments(css):
+    return re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+
+def parse_css(css):
+    """[(prelude, body)]; at-rule bodies are parsed recursively into lists."""
+    rules, i, n = [], 0, len(css)
+    while i < n:
+        start = css.find("{", i)
+        if start < 0:
+            break
+        prelude = css[i:start].strip()
+        depth, j, quote = 1, start + 1, None
+        while j < n and depth:
+            c = css[j]
+            if quote:
+                quote = None if c == quote else quote
+            elif c in "'\"":
+                quote = c
+            elif c == "{":
+                depth += 1
+            elif c == "}":
+                depth -= 1
+            j += 1
+        body = css[start + 1:j - 1]
+        if prelude.startswith("@media") or prelude.startswith("@supports"):
+            rules.append((prelude, parse_css(body)))
+        else:
+            rules.append((prelude, body))
+        i = j
+    return rules
+
+def page_tokens(markup):
+    tags = set(re.findall(r"<([a-zA-Z][\w-]*)", markup))
+    classes = {c for attr in re.findall(r'\sclass="([^"]*)"', markup) for c in attr.split()}
+    ids = set(re.findall(r'\sid="([^"]*)"', markup))
+    return {t.lower() for t in tags}, classes, ids
+
+def selector_used(selector, tokens):
+    """Conservative: keep a selector unless it names a tag/class/id the page lacks."""
+    tags, classes, ids = tokens
+    sel = re.sub(r"\[[^\]]*\]", "", selector)
+    sel = re.sub(r"::?[\w-]+(\([^)]*\))?", "", sel)
+    for compound in re.split(r"[\s>+~]+", sel.strip()):
+        if not compound or compound in ("*", ":root"):
+            continue
+        m = re.match(r"[a-zA-Z][\w-]*", compound)
+        if m and m.group(0).lower() not in tags and m.group(0).lower() not in ("html", "body"):
+            return False
+        if any(c not in classes for c in re.findall(r"\.([\w-]+)", compound)):
+            return False
+        if any(i not in ids for i in re.findall(r"#([\w-]+)", compound)):
+            return False
+    return True
+
+def squeeze(value):
+    """Collapse whitespace outside quoted strings."""
+    parts = re.split(r"""("[^"]*"|'[^']*')""", value)
+    for k in range(0, len(parts), 2):
+        p = re.sub(r"\s+", " ", parts[k])
+        parts[k] = re.sub(r"\s*([,{}])\s*", r"\1", p)
+    return "".join(parts).strip()
+
+def minify_decls(body):
+    decls = []
+    for decl in re.split(r""";(?=(?:[^'"]|'[^']*'|"[^"]*")*$)""", body):
+        if ":" in decl:
+            prop, value = decl.split(":", 1)
+            decls.append(f"{prop.strip()}:{squeeze(value)}")
+    return ";".join(decls)
+
+def critical_css(rules, tokens):
+    out = []
+    for prelude, body in rules:
+        if isinstance(body, list):
+            inner = critical_css(body, tokens)
+            if inner:
+                out.append(f"{squeeze(prelude)}{{{inner}}}")
+            continue
+        selectors = [s.strip() for s in prelude.split(",")]
+        used = [s for s in selectors if selector_used(s, tokens)]
+        if used:
+            selector = ",".join(re.sub(r"\s*>\s*", ">", squeeze(s)) for s in used)
+            out.append(f"{selector}{{{minify_decls(body)}}}")
+    return "".join(out)
+
+# ---------- HTML minifier ----------
+BLOCK_TAGS = {
+    "html", "head", "body", "meta", "link", "title", "style", "script", "noscript", "nav", "main",
+    "header", "footer", "section", "article", "aside", "div", "p", "h1", "h2", "h3", "h4", "h5",
+    "h6", "ul", "ol", "li", "form", "select", "option", "pre", "hr", "br", "table", "thead",
+    "tbody", "tr", "th", "td", "!doctype",
+}
+TOKEN_RE = re.compile(r"(<!--.*?-->|<pre\b.*?</pre>|<textarea\b.*?</textarea>|<script\b.*?</script>|<style\b.*?</style>|<[^>]+>)",
+                      re.S | re.I)
+
+def is_block(token):
+    m = re.match(r"</?([!\w-]+)", token or "")
+    return bool(m) and m.group(1).lower() in BLOCK_TAGS
+
+def minify_html(markup):
+    tokens = [t for t in TOKEN_RE.split(markup) if t and not t.startswith("<!--")]
+    out = []
+    for k, tok in enumerate(tokens):
+        low = tok[:9].lower()
+        if low.startswith(("<pre", "<textarea", "<style")):
+            out.append(tok)
+        elif low.startswith("<script"):
+            # keep line breaks (ASI), drop indentation and blank lines
+            out.append("\n".join(l.strip() for l in tok.splitlines() if l.strip()))
+        elif tok.startswith("<"):
+            out.append(re.sub(r"\s*(/?>)$", r"\1", re.sub(r"\s+", " ", tok)))
+        else:
+            text = re.sub(r"\s+", " ", tok)
+            if k == 0 or is_block(tokens[k - 1]):
+                text = text.lstrip()
+            if k == len(tokens) - 1 or is_block(tokens[k + 1]):
+                text = text.rstrip()
+            out.append(text)
+    return "".join(out)
+
+# ---------- site ----------
+def text_of(fragment):
+    return html.unescape(re.sub(r"\s+", " ", re.sub(r"<[^>]+>", " ", fragment))).strip()
+
+def page_main(p):
+    """Main-column HTML for a page; markdown pages get a baked table of contents."""
+    if p["markdown"] is None:
+        return p["body"]
+    body, headings = render_markdown(p["markdown"])
+    toc = "".join(f'<li><a href="#{hid}">{inline(text)}</a></li>' for level, hid, text in headings if level == 2)
+    return f'<div class="guide"><nav class="toc" aria-label="Contents"><ol>{toc}</ol></nav><article class="doc">{body}</article></div>'
+
+def render_nav(current):
+    links = []
+    for p in PAGES:
+        if not p["nav"]:
+            continue
+        cls = "btn primary" if p["out"] == "register.html" else "btn"
+        here = ' aria-current="page"' if p["out"] == current else ""
+        links.append(f'<a class="{cls}" href="{p["out"]}"{here}>{p["nav"]}</a>')
+    return "".join(links)
+
+def render_page(p):
+    main = page_main(p)
+    script = (p["script"] or "") + SEARCH_JS
+    description = f'<meta name="description" content="{html.escape(p["description"])}">' if p["description"] else ""
+    markup = LAYOUT.format(title=html.escape(p["title"]), description=description, css="", font=FONT_CSS,
+                           nav=render_nav(p["out"]), main_class=p["mainClass"], main=main, script=script)
+    css = critical_css(parse_css(strip_comments(STYLES_CSS)), page_tokens(markup + SEARCH_RESULT_MARKUP))
+    return minify_html(markup.replace("<style></style>", f"<style>{css}</style>", 1))
+
+def search_index():
+    """{docs: [[url, title, snippet]], terms: {term: [doc ids]}} over page sections."""
+    docs, terms = [], {}
+    heading_re = re.compile(r'<h([1-3])(?:[^>]*\sid="([^"]*)")?[^>]*>(.*?)</h\1>', re.S)
+    for p in PAGES:
+        main = page_main(p)
+        if p["markdown"] is not None:
+            main = main.split('<article class="doc">', 1)[1]
+        page_title = p["nav"] or p["title"]
+        cuts = list(heading_re.finditer(main)) or [None]
+        for k, m in enumerate(cuts):
+            start = m.end() if m else 0
+            end = cuts[k + 1].start() if k + 1 < len(cuts) and cuts[k + 1] else len(main)
+            heading = text_of(m.group(3)) if m else page_title
+            body = text_of(main[start:end])
+            if not body and not m:
+                continue
+            url = p["out"] + (f"#{m.group(2)}" if m and m.group(2) and p["markdown"] is not None else "")
+            title = page_title if heading == page_title else f"{page_title} › {heading}"
+            snippet = body[:117] + "…" if len(body) > 120 else body
+            doc_id = len(docs)
+            docs.append([url, title, snippet])
+            for term in set(re.findall(r"[a-z0-9_]{2,}", f"{heading} {body}".lower())):
+                terms.setdefault(term, []).append(doc_id)
+    return {"docs": docs, "terms": dict(sorted(terms.items()))}
+
+def outputs():
+    """[(rel path, sources, render)]; `sources` feeds the incremental build hash."""
+    shared = [BUILD_VERSION, LAYOUT, STYLES_CSS, SEARCH_JS, [(p["out"], p["nav"]) for p in PAGES]]
+    items = [("README.md", [BUILD_VERSION, README_LINES], lambda: "\n".join(README_LINES) + "\n")]
+    for p in PAGES:
+        items.append((f"docs/{p['out']}", shared + [p], lambda p=p: render_page(p)))
+    items.append(("docs/search.json", [BUILD_VERSION, PAGES],
+                  lambda: json.dumps(search_index(), ensure_ascii=False, separators=(",", ":")) + "\n"))
+    return items
+
+def render_site():
+    """Every output as [(rel path, content)] (watch.py diffs these itself)."""
+    return [(rel, render()) for rel, _sources, render in outputs()]
+
+def digest(sources):
+    return hashlib.sha256(json.dumps(sources, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def file_digest(path):
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+def write_if_changed(path, content):
+    try:
+        with open(path, encoding="utf-8") as f:
+            if f.read() == content:
+                return False
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(path + ".tmp", path)
+    return True
+
+def build(target, force=False):
+    manifest_path = os.path.join(target, MANIFEST)
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        manifest = {}
+
+    written = skipped = 0
+    for rel, sources, render in outputs():
+        path = os.path.join(target, rel)
+        entry = {"sources": digest(sources), "output": file_digest(path)}
+        # Output missing or edited by hand -> entry differs, so it is rebuilt too
+        if not force and entry["output"] and manifest.get(rel) == entry:
+            skipped += 1
+            continue
+        content = render()
+        if write_if_changed(path, content):
+            written += 1
+            print(f"✓ Wrote {rel} ({len(content.encode('utf-8'))} bytes)")
+        else:
+            skipped += 1
+        entry["output"] = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        manifest[rel] = entry
+        if rel.endswith(".html"):
+            gz = len(gzip.compress(content.encode("utf-8")))
+            if gz > ROUND_TRIP_BYTES:
+                print(f"⚠️  {rel} is {gz / 1024:.1f} KiB gzipped; over one ~14 KiB round trip")
+
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(manifest_path + ".tmp", manifest_path)
+    print(f"✅ Docs: {written} written, {skipped} unchanged")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Build docs/ and README.md")
+    ap.add_argument("target", nargs="?", default=os.getcwd(), help="project directory (default: cwd)")
+    ap.add_argument("--force", action="store_true", help="ignore the build manifest")
+    args = ap.parse_args(argv)
+    build(os.path.abspath(args.target), args.force)
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,20 @@
 # env_gen.py
 # Writes .env.example and .env safely
+#
+# Usage:
+#   python make_env.py                     # detect host, pick a profile
+#   python make_env.py --profile termux    # force termux | small-vps | server
+#
+# The performance block (workers, SQLite cache/mmap, connection limits,
+# compression threshold) is sized from CPU count, available RAM and whether
+# we're running inside Termux. server.js and db.js read these values.
 
 import os
+import sys
 from datetime import datetime
 
+from make_config import build as build_config
+
 def backup_and_write(path: str, content: str):
     if os.path.exists(path):
         ts = datetime.now().strftime("%Y%m%d-%H%M%S")
@@ -15,6 +26,103 @@ def backup_and_write(path: str, content: str):
         f.write(content)
     print(f"✓ Wrote {path}")
 
+# ---------- host detection ----------
+def is_termux():
+    return "TERMUX_VERSION" in os.environ or "com.termux" in os.environ.get("PREFIX", "")
+
+def available_ram_mb():
+    """MemAvailable from /proc/meminfo, falling back to sysconf; None if unknown."""
+    try:
+        with open("/proc/meminfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") // (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return None
+
+def detect_host():
+    return {
+        "cpus": os.cpu_count() or 1,
+        "ram_mb": available_ram_mb() or 1024,
+        "termux": is_termux(),
+    }
+
+# ---------- performance profiles ----------
+# Upper bounds per profile; values are clamped to what the host can afford.
+PROFILES = {
+    "termux": {
+        "WEB_CONCURRENCY": 1,          # phones throttle hard; one worker is faster
+        "SQLITE_CACHE_MB": 16,
+        "SQLITE_MMAP_MB": 64,
+        "MAX_CONNECTIONS": 64,
+        "LISTEN_BACKLOG": 128,
+        "COMPRESSION_THRESHOLD": 512,  # slow mobile links: compress small bodies too
+        "KEEP_ALIVE_TIMEOUT_MS": 15000,  # mobile handshakes are expensive; reuse longer
+    },
+    "small-vps": {
+        "WEB_CONCURRENCY": 2,
+        "SQLITE_CACHE_MB": 32,
+        "SQLITE_MMAP_MB": 128,
+        "MAX_CONNECTIONS": 256,
+        "LISTEN_BACKLOG": 511,
+        "COMPRESSION_THRESHOLD": 1024,
+        "KEEP_ALIVE_TIMEOUT_MS": 10000,
+    },
+    "server": {
+        "WEB_CONCURRENCY": 8,
+        "SQLITE_CACHE_MB": 128,
+        "SQLITE_MMAP_MB": 512,
+        "MAX_CONNECTIONS": 2048,
+        "LISTEN_BACKLOG": 2048,
+        "COMPRESSION_THRESHOLD": 1024,
+        "KEEP_ALIVE_TIMEOUT_MS": 65000,  # outlast a proxy/LB's 60 s idle timeout
+        "TRUST_PROXY": "loopback",     # proxy on the same host; req.ip is the client
+    },
+}
+
+def pick_profile(host):
+    if host["termux"]:
+        return "termux"
+    if host["cpus"] >= 4 and host["ram_mb"] >= 4096:
+        return "server"
+    return "small-vps"
+
+def tune(profile, host):
+    """Profile values clamped to the host: one worker per CPU, and SQLite
+    cache/mmap kept to ~2% / ~10% of available RAM per worker."""
+    values = dict(PROFILES[profile])
+    workers = max(1, min(values["WEB_CONCURRENCY"], host["cpus"]))
+    values["WEB_CONCURRENCY"] = workers
+    per_worker_mb = host["ram_mb"] // workers
+    values["SQLITE_CACHE_MB"] = max(2, min(values["SQLITE_CACHE_MB"], per_worker_mb // 50))
+    values["SQLITE_MMAP_MB"] = max(0, min(values["SQLITE_MMAP_MB"], per_worker_mb // 10))
+    return values
+
+def performance_lines(profile, host):
+    values = tune(profile, host)
+    lines = [
+        "",
+        f"# Performance profile: {profile} "
+        f"(detected {host['cpus']} CPU, {host['ram_mb']} MB free RAM"
+        f"{', Termux' if host['termux'] else ''})",
+        f"PERF_PROFILE={profile}",
+    ]
+    lines += [f"{k}={v}" for k, v in values.items()]
+    return lines
+
+def profile_from_argv(argv):
+    if "--profile" in argv:
+        i = argv.index("--profile")
+        if i + 1 < len(argv) and argv[i + 1] in PROFILES:
+            return argv[i + 1]
+        print(f"! Unknown profile; choose one of: {', '.join(PROFILES)}")
+        sys.exit(2)
+    return None
+
 # Example template (user edits values)
 example_lines = [
 "# Example environment variables",
@@ -38,6 +146,44 @@ example_lines = [
 "# Other",
 "BASE_URL=http://localhost:3000",
 "NODE_ENV=development",
+"",
+"# Reverse proxy whose X-Forwarded-For is believed for req.ip (rate limits, logs):",
+"# empty = none, a hop count (1), loopback, or comma-separated proxy IPs/subnets",
+"TRUST_PROXY=",
+"",
+"# Sessions: sqlite is shared by cluster workers; memory forces WEB_CONCURRENCY=1",
+"SESSION_STORE=sqlite",
+"",
+"# Instrumentation (Server-Timing headers + /metrics for scrapers sending",
+"# Authorization: Bearer <METRICS_TOKEN>; no token = /metrics closed)",
+"METRICS_ENABLED=false",
+"METRICS_TOKEN=",
+"",
+"# Health probes (background interval; /health only reads cached results)",
+"HEALTH_INTERVAL_MS=15000",
+"HEALTH_TIMEOUT_MS=2000",
+"HEALTH_SMTP_INTERVAL_MS=300000",
+"",
+"# Rate limits (token buckets per IP and per account)",
+"RATE_LIMIT_AUTH_PER_MIN=10",
+"RATE_LIMIT_AUTH_PER_MIN_IP=120",
+"RATE_LIMIT_PIN_PER_MIN=5",
+"RATE_LIMIT_PIN_PER_MIN_IP=60",
+"RATE_LIMIT_MAX_KEYS=50000",
+"",
+"# Rendered student/parent dashboards (per process; PAGE_CACHE_MB=0 disables)",
+"PAGE_CACHE_MB=8",
+"PAGE_CACHE_MAX_ENTRIES=5000",
+"PAGE_CACHE_TTL_SEC=300",
+"",
+"# Graceful shutdown (SIGTERM drains in-flight requests for up to this long)",
+"SHUTDOWN_TIMEOUT_MS=10000",
+"HEADERS_TIMEOUT_MS=20000",
+"REQUEST_TIMEOUT_MS=120000",
+"",
+"# Admin-only CPU/heap profiling (/admin/profile/*); artifacts land in PROFILE_DIR",
+"PROFILING_ENABLED=false",
+"PROFILE_DIR=profiles",
 ]
 
 # A starter .env (you can change it later)
@@ -53,8 +199,15 @@ env_lines = [
 "FROM_EMAIL=School Portal <drclem8@gmail.com>",
 "BASE_URL=http://localhost:3000",
 "NODE_ENV=development",
+"METRICS_ENABLED=false",
 ]
 
 if __name__ == "__main__":
-    backup_and_write(".env.example", "\n".join(example_lines) + "\n")
-    backup_and_write(".env", "\n".join(env_lines) + "\n")
\ No newline at end of file
+    host = detect_host()
+    profile = profile_from_argv(sys.argv[1:]) or pick_profile(host)
+    perf = performance_lines(profile, host)
+    print(f"Host: {host['cpus']} CPU, {host['ram_mb']} MB free RAM, termux={host['termux']} -> profile '{profile}'")
+    backup_and_write(".env.example", "\n".join(example_lines + perf) + "\n")
+    backup_and_write(".env", "\n".join(env_lines + perf) + "\n")
+    if not build_config(os.getcwd()):
+        sys.exit(1)
\ No newline at end of file
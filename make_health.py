@@ -0,0 +1,165 @@
+# make_health.py
+# Writes src/utils/health.js — cached dependency probes for /health.
+#
+# Usage:
+#   python make_health.py              # writes into current directory
+#   python make_health.py /path/to/app # writes into given directory
+#
+# Probes (SQLite, session store, SMTP) run on a background timer and their
+# status/latency is cached. /health/live and /health/ready only read that
+# cache, so load-balancer pings never touch the database or mail server.
+#
+# Env knobs:
+#   HEALTH_INTERVAL_MS       probe interval (default 15000)
+#   HEALTH_TIMEOUT_MS        per-probe timeout (default 2000)
+#   HEALTH_SMTP_INTERVAL_MS  SMTP verify interval (default 300000)
+
+import os
+import sys
+from datetime import datetime
+
+HEALTH_JS = r"""// src/utils/health.js
+// Background dependency probes with cached results.
+// Handlers only serialize the cache; they never run a probe themselves.
+const config = require('../config');
+
+const INTERVAL_MS = config.HEALTH_INTERVAL_MS;
+const TIMEOUT_MS = config.HEALTH_TIMEOUT_MS;
+
+const probes = new Map(); // name -> { fn, critical, intervalMs, nextAt, running, result }
+const startedAt = Date.now();
+let timer = null;
+let lastTickAt = 0;
+let version = 0;          // bumps whenever a probe result lands
+let draining = false;     // set by drain() during graceful shutdown
+
+/**
+ * Register a probe. `fn` may be sync or return a promise; throwing/rejecting
+ * marks it down. Non-critical probes are reported but don't fail readiness.
+ */
+function register(name, fn, { critical = true, intervalMs = INTERVAL_MS } = {}) {
+  probes.set(name, { fn, critical, intervalMs, nextAt: 0, running: false, result: null });
+}
+
+function withTimeout(promise, ms) {
+  let t;
+  const timeout = new Promise((_, reject) => {
+    t = setTimeout(() => reject(new Error(`timed out after ${ms}ms`)), ms);
+  });
+  return Promise.race([promise, timeout]).finally(() => clearTimeout(t));
+}
+
+async function runProbe(probe) {
+  probe.running = true;
+  const t0 = process.hrtime.bigint();
+  let ok = true;
+  let error;
+  try {
+    await withTimeout(Promise.resolve().then(probe.fn), TIMEOUT_MS);
+  } catch (e) {
+    ok = false;
+    error = e.message;
+  }
+  const latencyMs = Number(process.hrtime.bigint() - t0) / 1e6;
+  probe.result = { ok, latencyMs: Math.round(latencyMs * 100) / 100, checkedAt: new Date().toISOString() };
+  if (error) probe.result.error = error;
+  probe.nextAt = Date.now() + probe.intervalMs;
+  probe.running = false;
+  version++;
+}
+
+// Fire every due probe; a slow probe never delays the others or overlaps itself.
+function tick() {
+  const now = Date.now();
+  lastTickAt = now;
+  for (const probe of probes.values()) {
+    if (!probe.running && probe.nextAt <= now) runProbe(probe);
+  }
+}
+
+function start() {
+  if (timer) return;
+  tick();
+  timer = setInterval(tick, INTERVAL_MS);
+  timer.unref(); // never keep the process alive just for probes
+}
+
+function stop() {
+  clearInterval(timer);
+  timer = null;
+}
+
+// Fail readiness from now on so load balancers stop routing here; liveness is unaffected.
+function drain() {
+  draining = true;
+  version++;
+}
+
+/* ---------- Snapshots (memory only) ---------- */
+function readiness() {
+  const checks = {};
+  let ok = probes.size > 0;
+  for (const [name, probe] of probes) {
+    checks[name] = probe.result || { ok: false, error: 'pending' };
+    if (probe.critical && !(probe.result && probe.result.ok)) ok = false;
+  }
+  if (draining) return { ok: false, status: 'draining', checks };
+  return { ok, status: ok ? 'ready' : 'unavailable', checks };
+}
+
+function liveness() {
+  // Alive while the probe timer keeps ticking; a wedged timer means a wedged event loop.
+  const ok = !timer || Date.now() - lastTickAt < INTERVAL_MS * 3;
+  return { ok, status: ok ? 'alive' : 'stalled', uptimeSec: Math.round((Date.now() - startedAt) / 1000) };
+}
+
+/**
+ * Express handler for 'live' or 'ready'. The readiness body is rebuilt only
+ * after a probe reports, so each ping is a cached string write.
+ */
+function handler(kind = 'ready', extra = {}) {
+  let cachedVersion = -1;
+  let cached = null;
+  return (_req, res) => {
+    if (kind === 'live') {
+      const snap = liveness();
+      return res.status(snap.ok ? 200 : 503).json({ ...extra, ...snap });
+    }
+    if (cachedVersion !== version) {
+      const snap = readiness();
+      cached = { code: snap.ok ? 200 : 503, body: JSON.stringify({ ...extra, ...snap }) };
+      cachedVersion = version;
+    }
+    res.status(cached.code).type('application/json').send(cached.body);
+  };
+}
+
+module.exports = { register, start, stop, drain, readiness, liveness, handler };
+"""
+
+def write_file(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        ts = datetime.now().strftime("%Y%m%d-%H%M%S")
+        backup = f"{path}.bak-{ts}"
+        try:
+            with open(path, "rb") as rf, open(backup, "wb") as wf:
+                wf.write(rf.read())
+            print(f"• Backed up existing file to {backup}")
+        except Exception as e:
+            print(f"! Could not backup {path}: {e}")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    print(f"✓ Wrote {path}")
+
+def main():
+    target = sys.argv[1] if len(sys.argv) > 1 else os.getcwd()
+    target = os.path.abspath(target)
+    write_file(os.path.join(target, "src", "utils", "health.js"), HEALTH_JS)
+
+    print("\nTest:")
+    print("  curl http://127.0.0.1:3000/health/live")
+    print("  curl http://127.0.0.1:3000/health/ready")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+# make_metrics.py
+# Writes src/utils/metrics.js — request instrumentation for the generated server.
+#
+# Usage:
+#   python make_metrics.py              # writes into current directory
+#   python make_metrics.py /path/to/app # writes into given directory
+#
+# What it records (only when METRICS_ENABLED=true in .env):
+#   - per-route latency histograms
+#   - DB query count and time (better-sqlite3 statements)
+#   - EJS template render time
+#   - event-loop lag
+# Each response gets a `Server-Timing` header, and GET /metrics serves the
+# numbers in Prometheus text format to scrapers sending
+# `Authorization: Bearer $METRICS_TOKEN`. The peer address proves nothing here:
+# behind a reverse proxy on the same host every request comes from 127.0.0.1.
+# Without a token /metrics stays closed. When disabled, every hook is a
+# pass-through.
+#
+# With cluster workers (WEB_CONCURRENCY > 1) each worker counts its own
+# requests. A scrape lands on any one of them, so that worker asks the primary,
+# which collects every worker's numbers over IPC and sums them per series;
+# counters never appear to reset when consecutive scrapes hit different workers.
+
+import os
+import sys
+from datetime import datetime
+
+METRICS_JS = r"""// src/utils/metrics.js
+// Request instrumentation: Server-Timing headers + Prometheus-style /metrics.
+// Enable with METRICS_ENABLED=true. When disabled every hook is a pass-through.
+const { AsyncLocalStorage } = require('async_hooks');
+const cluster = require('cluster');
+const crypto = require('crypto');
+const { performance, monitorEventLoopDelay } = require('perf_hooks');
+
+const config = require('../config');
+
+const enabled = config.METRICS_ENABLED;
+
+// Latency buckets in seconds (upper bounds).
+const BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10];
+const COLLECT_TIMEOUT_MS = 1000; // primary waits this long for every worker's numbers
+
+const als = new AsyncLocalStorage();
+const routes = new Map();   // "METHOD route status" -> histogram
+const renders = new Map();  // view name -> histogram
+const db = { queries: 0, seconds: 0 };
+const collectors = []; // other modules' metric writers, see addCollector
+let loop = null;
+
+function newHistogram() {
+  return { counts: new Array(BUCKETS.length).fill(0), sum: 0, count: 0 };
+}
+
+function observe(map, key, seconds) {
+  let h = map.get(key);
+  if (!h) map.set(key, (h = newHistogram()));
+  for (let i = 0; i < BUCKETS.length; i++) {
+    if (seconds <= BUCKETS[i]) { h.counts[i]++; break; }
+  }
+  h.sum += seconds;
+  h.count++;
+}
+
+function routeLabel(req) {
+  // Use the route pattern (/student/:id), never the raw URL, to keep cardinality low.
+  if (req.route && req.route.path) return (req.baseUrl || '') + req.route.path;
+  return 'unmatched';
+}
+
+/* ---------- Express hooks ---------- */
+function middleware() {
+  if (!enabled) return (_req, _res, next) => next();
+
+  if (!loop) {
+    loop = monitorEventLoopDelay({ resolution: 20 });
+    loop.enable();
+  }
+
+  return (req, res, next) => {
+    const timing = { start: performance.now(), dbCount: 0, dbMs: 0, renderMs: 0 };
+
+    const writeHead = res.writeHead;
+    res.writeHead = function (...args) {
+      if (!res.headersSent) {
+        const total = performance.now() - timing.start;
+        res.setHeader('Server-Timing', [
+          `db;dur=${timing.dbMs.toFixed(2)};desc="${timing.dbCount} queries"`,
+          `render;dur=${timing.renderMs.toFixed(2)}`,
+          `total;dur=${total.toFixed(2)}`,
+        ].join(', '));
+      }
+      return writeHead.apply(this, args);
+    };
+
+    res.on('finish', () => {
+      const seconds = (performance.now() - timing.start) / 1000;
+      observe(routes, `${req.method} ${routeLabel(req)} ${res.statusCode}`, seconds);
+    });
+
+    als.run(timing, next);
+  };
+}
+
+// Times app.render (used by res.render) and attributes it to the current request.
+function instrumentApp(app) {
+  if (!enabled) return app;
+  const render = app.render;
+  app.render = function (name, options, callback) {
+    if (typeof options === 'function') { callback = options; options = {}; }
+    const t0 = performance.now();
+    const timing = als.getStore();
+    return render.call(this, name, options, (err, html) => {
+      const ms = performance.now() - t0;
+      observe(renders, name, ms / 1000);
+      if (timing) timing.renderMs += ms;
+      callback(err, html);
+    });
+  };
+  return app;
+}
+
+/* ---------- better-sqlite3 hooks ---------- */
+function record(ms) {
+  db.queries++;
+  db.seconds += ms / 1000;
+  const timing = als.getStore();
+  if (timing) { timing.dbCount++; timing.dbMs += ms; }
+}
+
+function timed(fn) {
+  return function (...args) {
+    const t0 = performance.now();
+    try {
+      return fn.apply(this, args);
+    } finally {
+      record(performance.now() - t0);
+    }
+  };
+}
+
+function wrapStatement(stmt) {
+  for (const m of ['run', 'get', 'all']) stmt[m] = timed(stmt[m]);
+  const iterate = stmt.iterate;
+  stmt.iterate = function* (...args) {
+    // Time is spent while stepping, so accumulate across the whole iteration.
+    let ms = 0;
+    let t0 = performance.now();
+    const it = iterate.apply(this, args);
+    try {
+      for (;;) {
+        const step = it.next();
+        ms += performance.now() - t0;
+        if (step.done) return;
+        yield step.value;
+        t0 = performance.now();
+      }
+    } finally {
+      if (typeof it.return === 'function') it.return();
+      record(ms);
+    }
+  };
+  return stmt;
+}
+
+// Wraps db.prepare / db.exec so every statement reports its time.
+function instrumentDb(database) {
+  if (!enabled || !database) return database;
+  const prepare = database.prepare.bind(database);
+  database.prepare = (sql) => wrapStatement(prepare(sql));
+  database.exec = timed(database.exec.bind(database));
+  return database;
+}
+
+/* ---------- /metrics ---------- */
+function esc(v) {
+  return String(v).replace(/\\/g, '\\\\').replace(/"/g, '\\"').replace(/\n/g, '\\n');
+}
+
+function writeHistogram(out, name, labels, h) {
+  let cumulative = 0;
+  for (let i = 0; i < BUCKETS.length; i++) {
+    cumulative += h.counts[i];
+    out.push(`${name}_bucket{${labels},le="${BUCKETS[i]}"} ${cumulative}`);
+  }
+  out.push(`${name}_bucket{${labels},le="+Inf"} ${h.count}`);
+  out.push(`${name}_sum{${labels}} ${h.sum}`);
+  out.push(`${name}_count{${labels}} ${h.count}`);
+}
+
+function render() {
+  const out = [];
+
+  out.push('# HELP http_request_duration_seconds Request latency by route.');
+  out.push('# TYPE http_request_duration_seconds histogram');
+  for (const [key, h] of routes) {
+    const [method, route, status] = key.split(' ');
+    writeHistogram(out, 'http_request_duration_seconds',
+      `method="${esc(method)}",route="${esc(route)}",status="${esc(status)}"`, h);
+  }
+
+  out.push('# HELP template_render_duration_seconds EJS render time by view.');
+  out.push('# TYPE template_render_duration_seconds histogram');
+  for (const [view, h] of renders) {
+    writeHistogram(out, 'template_render_duration_seconds', `view="${esc(view)}"`, h);
+  }
+
+  out.push('# HELP db_queries_total SQLite statements executed.');
+  out.push('# TYPE db_queries_total counter');
+  out.push(`db_queries_total ${db.queries}`);
+  out.push('# HELP db_query_seconds_total Time spent executing SQLite statements.');
+  out.push('# TYPE db_query_seconds_total counter');
+  out.push(`db_query_seconds_total ${db.seconds}`);
+
+  if (loop) {
+    out.push('# HELP nodejs_eventloop_lag_seconds Event-loop delay since the last scrape.');
+    out.push('# TYPE nodejs_eventloop_lag_seconds gauge');
+    out.push(`nodejs_eventloop_lag_seconds{quantile="0.5"} ${loop.percentile(50) / 1e9}`);
+    out.push(`nodejs_eventloop_lag_seconds{quantile="0.99"} ${loop.percentile(99) / 1e9}`);
+    out.push(`nodejs_eventloop_lag_seconds{quantile="1"} ${loop.max / 1e9}`);
+    loop.reset();
+  }
+
+  for (const collect of collectors) collect(out);
+
+  return out.join('\n') + '\n';
+}
+
+// fn(out) pushes Prometheus text lines onto `out` on every scrape.
+function addCollector(fn) {
+  collectors.push(fn);
+}
+
+/* ---------- cluster aggregation ---------- */
+// Sums the workers' samples per series: counters, histogram buckets and cache
+// sizes add up. Quantile gauges (event-loop lag) report the worst worker.
+function merge(texts) {
+  const families = new Map(); // metric name -> { comments, type, samples: series -> value }
+  const family = (name) => {
+    let f = families.get(name);
+    if (!f) families.set(name, (f = { comments: [], type: 'untyped', samples: new Map() }));
+    return f;
+  };
+  for (const text of texts) {
+    let current = family('');
+    for (const line of text.split('\n')) {
+      if (!line) continue;
+      const meta = /^# (HELP|TYPE) (\S+) ?(.*)$/.exec(line);
+      if (meta) {
+        current = family(meta[2]);
+        if (meta[1] === 'TYPE') current.type = meta[3];
+        if (!current.comments.includes(line)) current.comments.push(line);
+        continue;
+      }
+      const at = line.lastIndexOf(' ');
+      const series = line.slice(0, at);
+      const value = Number(line.slice(at + 1));
+      const prev = current.samples.get(series);
+      const worst = current.type === 'gauge' && series.includes('quantile=');
+      current.samples.set(series, prev === undefined ? value : worst ? Math.max(prev, value) : prev + value);
+    }
+  }
+  const out = [
+    '# HELP nodejs_cluster_workers_scraped Workers whose numbers are included in this scrape.',
+    '# TYPE nodejs_cluster_workers_scraped gauge',
+    `nodejs_cluster_workers_scraped ${texts.length}`,
+  ];
+  for (const f of families.values()) {
+    out.push(...f.comments);
+    for (const [series, value] of f.samples) out.push(`${series} ${value}`);
+  }
+  return out.join('\n') + '\n';
+}
+
+let seq = 0;
+const pending = new Map(); // id -> resolve(text)
+
+if (enabled && cluster.isWorker) {
+  process.on('message', (msg) => {
+    if (!msg) return;
+    if (msg.cmd === 'metrics:collect') {
+      process.send({ cmd: 'metrics:snapshot', id: msg.id, text: render() });
+    } else if (msg.cmd === 'metrics:result') {
+      const resolve = pending.get(msg.id);
+      if (resolve) {
+        pending.delete(msg.id);
+        resolve(msg.text);
+      }
+    }
+  });
+}
+
+// Whole-cluster text in a worker (via the primary); this process's own otherwise.
+function scrape() {
+  if (!cluster.isWorker || !process.connected) return Promise.resolve(render());
+  return new Promise((resolve) => {
+    const id = ++seq;
+    const timer = setTimeout(() => {
+      // Primary busy or gone: this worker's numbers beat no answer
+      pending.delete(id);
+      resolve(merge([render()]));
+    }, COLLECT_TIMEOUT_MS * 2);
+    pending.set(id, (text) => { clearTimeout(timer); resolve(text); });
+    process.send({ cmd: 'metrics:scrape', id });
+  });
+}
+
+// Call once in the cluster primary.
+function servePrimary(clusterModule = cluster) {
+  if (!enabled) return;
+  let next = 0;
+  const scrapes = new Map(); // id -> { texts, waiting, finish }
+  clusterModule.on('message', (worker, msg) => {
+    if (!msg) return;
+    if (msg.cmd === 'metrics:scrape') {
+      const workers = Object.values(clusterModule.workers).filter((w) => w && w.isConnected());
+      const id = ++next;
+      const s = { texts: [], waiting: workers.length };
+      const timer = setTimeout(() => s.finish(), COLLECT_TIMEOUT_MS); // a hung worker is left out
+      s.finish = () => {
+        if (!scrapes.delete(id)) return;
+        clearTimeout(timer);
+        if (worker.isConnected()) worker.send({ cmd: 'metrics:result', id: msg.id, text: merge(s.texts) });
+      };
+      scrapes.set(id, s);
+      for (const w of workers) w.send({ cmd: 'metrics:collect', id });
+    } else if (msg.cmd === 'metrics:snapshot') {
+      const s = scrapes.get(msg.id);
+      if (!s) return;
+      s.texts.push(msg.text);
+      if (--s.waiting === 0) s.finish();
+    }
+  });
+}
+
+// Compare digests so the check takes the same time whatever the guess
+const digest = (s) => crypto.createHash('sha256').update(s).digest();
+const TOKEN = config.METRICS_TOKEN ? digest(config.METRICS_TOKEN) : null;
+if (enabled && !TOKEN) console.warn('⚠️  METRICS_ENABLED without METRICS_TOKEN: /metrics refuses every scrape');
+
+function authorized(req) {
+  const m = /^Bearer (.+)$/.exec(req.get('authorization') || '');
+  return Boolean(TOKEN && m && crypto.timingSafeEqual(digest(m[1]), TOKEN));
+}
+
+function handler(req, res) {
+  if (!enabled) return res.status(404).send('metrics disabled');
+  if (!authorized(req)) return res.status(403).send('Forbidden');
+  scrape().then((text) => res.type('text/plain; version=0.0.4').send(text));
+}
+
+module.exports = { enabled, middleware, instrumentApp, instrumentDb, handler, render, addCollector, merge, servePrimary };
+"""
+
+def write_file(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        ts = datetime.now().strftime("%Y%m%d-%H%M%S")
+        backup = f"{path}.bak-{ts}"
+        try:
+            with open(path, "rb") as rf, open(backup, "wb") as wf:
+                wf.write(rf.read())
+            print(f"• Backed up existing file to {backup}")
+        except Exception as e:
+            print(f"! Could not backup {path}: {e}")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    print(f"✓ Wrote {path}")
+
+def main():
+    target = sys.argv[1] if len(sys.argv) > 1 else os.getcwd()
+    target = os.path.abspath(target)
+    write_file(os.path.join(target, "src", "utils", "metrics.js"), METRICS_JS)
+
+    print("\nNext steps:")
+    print("  1) Set METRICS_ENABLED=true and METRICS_TOKEN=<long random string> in .env")
+    print('  2) Restart the server, then: curl -H "Authorization: Bearer $METRICS_TOKEN" http://127.0.0.1:3000/metrics')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+# make_pagecache.py
+# Writes src/utils/pagecache.js — per-user rendered-page cache with tag
+# invalidation for the student and parent dashboards.
+#
+# Usage:
+#   python make_pagecache.py              # writes into current directory
+#   python make_pagecache.py /path/to/app # writes into given directory
+#
+# A cached page is keyed on user + URL and tagged with the entities it was
+# built from (student:<id>, parent:<id>, ...). Writers call
+# pagecache.invalidate(tags) after committing; with cluster workers the primary
+# relays invalidations to every worker. Each tag carries a version number, so a
+# page rendered from data that was changed mid-render is never stored.
+# Hits skip both the DB queries and the EJS render.
+#
+# Env knobs:
+#   PAGE_CACHE_MB           memory bound per process (default 8, 0 = off)
+#   PAGE_CACHE_MAX_ENTRIES  entry bound per process (default 5000)
+#   PAGE_CACHE_TTL_SEC      safety net for writes made outside the app (default 300)
+# Hit/miss/eviction counters show up on /metrics (METRICS_ENABLED=true).
+
+import os
+import sys
+from datetime import datetime
+
+PAGECACHE_JS = r"""// src/utils/pagecache.js
+// Rendered-page LRU with tag invalidation. In cluster mode the primary
+// relays invalidations between workers (see servePrimary).
+const cluster = require('cluster');
+const config = require('../config');
+const metrics = require('./metrics');
+
+const MAX_BYTES = config.PAGE_CACHE_MB * 1024 * 1024;
+const MAX_ENTRIES = config.PAGE_CACHE_MAX_ENTRIES;
+const TTL_MS = config.PAGE_CACHE_TTL_SEC * 1000;
+const enabled = MAX_BYTES > 0 && MAX_ENTRIES > 0;
+
+/* ---------- LRU + tag index ---------- */
+// Map keeps insertion order: re-inserting on access makes the first key the LRU.
+const entries = new Map();  // key -> { html, bytes, at, tags: [[tag, version]] }
+const byTag = new Map();    // tag -> Set(keys)
+const versions = new Map(); // tag -> version (absent = 0)
+const stats = { hits: 0, misses: 0, stale: 0, evictions: 0, invalidations: 0, bytes: 0 };
+
+function drop(key) {
+  const e = entries.get(key);
+  if (!e) return;
+  entries.delete(key);
+  stats.bytes -= e.bytes;
+  for (const [tag] of e.tags) {
+    const keys = byTag.get(tag);
+    if (keys && keys.delete(key) && !keys.size) byTag.delete(tag);
+  }
+}
+
+function get(key) {
+  const e = entries.get(key);
+  if (!e) return null;
+  if (Date.now() - e.at > TTL_MS) {
+    drop(key);
+    return null;
+  }
+  entries.delete(key);
+  entries.set(key, e);
+  return e.html;
+}
+
+// `tags` is the [[tag, version]] snapshot taken before the page's data was read.
+function set(key, html, tags) {
+  if (tags.some(([tag, v]) => (versions.get(tag) || 0) !== v)) {
+    stats.stale++; // invalidated while rendering; the next visit rebuilds it
+    return;
+  }
+  const bytes = Buffer.byteLength(html);
+  if (bytes > MAX_BYTES / 4) return;
+  drop(key);
+  while (entries.size && (entries.size >= MAX_ENTRIES || stats.bytes + bytes > MAX_BYTES)) {
+    drop(entries.keys().next().value);
+    stats.evictions++;
+  }
+  entries.set(key, { html, bytes, at: Date.now(), tags });
+  stats.bytes += bytes;
+  for (const [tag] of tags) {
+    if (!byTag.has(tag)) byTag.set(tag, new Set());
+    byTag.get(tag).add(key);
+  }
+}
+
+function invalidateLocal(tags) {
+  for (const tag of tags) {
+    versions.set(tag, (versions.get(tag) || 0) + 1);
+    const keys = byTag.get(tag);
+    if (keys) for (const key of [...keys]) drop(key);
+  }
+  stats.invalidations += tags.length;
+}
+
+/* ---------- cluster IPC ---------- */
+if (cluster.isWorker) {
+  process.on('message', (msg) => {
+    if (msg && msg.cmd === 'pagecache:invalidate') invalidateLocal(msg.tags);
+  });
+}
+
+// Call after the write has committed, e.g. invalidate([`student:${id}`]).
+function invalidate(tags) {
+  tags = [].concat(tags).map(String);
+  if (!tags.length) return;
+  invalidateLocal(tags);
+  if (cluster.isWorker && process.connected) process.send({ cmd: 'pagecache:invalidate', tags });
+}
+
+// Call once in the cluster primary: fan invalidations out to the other workers.
+function servePrimary(clusterModule = cluster) {
+  clusterModule.on('message', (worker, msg) => {
+    if (!msg || msg.cmd !== 'pagecache:invalidate') return;
+    for (const id in clusterModule.workers) {
+      const w = clusterModule.workers[id];
+      if (w && w !== worker && w.isConnected()) w.send(msg);
+    }
+  });
+}
+
+/* ---------- Express wrapper ---------- */
+/**
+ * page({ tags }, handler) — caches whatever `handler` passes to res.render.
+ * `tags(req)` lists the entities the page depends on; it may read the DB
+ * (e.g. a parent's children) but should be cheap. Only GETs by a logged-in
+ * user are cached, keyed on user id + URL.
+ */
+function page({ tags }, handler) {
+  if (!enabled) return handler;
+  return (req, res, next) => {
+    const user = req.session && req.session.user;
+    if (req.method !== 'GET' || !user) return handler(req, res, next);
+    const key = `${user.id}:${req.originalUrl}`;
+    const html = get(key);
+    if (html !== null) {
+      stats.hits++;
+      res.set('X-Page-Cache', 'hit');
+      return res.type('html').send(html);
+    }
+    stats.misses++;
+    const snapshot = tags(req).map((tag) => [String(tag), versions.get(String(tag)) || 0]);
+    const render = res.render;
+    res.render = function (view, locals, callback) {
+      if (typeof locals === 'function') { callback = locals; locals = {}; }
+      render.call(this, view, locals, (err, out) => {
+        if (callback) return callback(err, out);
+        if (err) return next(err);
+        if (res.statusCode === 200) set(key, out, snapshot);
+        res.set('X-Page-Cache', 'miss');
+        res.send(out);
+      });
+    };
+    handler(req, res, next);
+  };
+}
+
+metrics.addCollector((out) => {
+  out.push('# HELP page_cache_requests_total Dashboard page cache lookups.');
+  out.push('# TYPE page_cache_requests_total counter');
+  out.push(`page_cache_requests_total{result="hit"} ${stats.hits}`);
+  out.push(`page_cache_requests_total{result="miss"} ${stats.misses}`);
+  out.push('# HELP page_cache_stale_total Renders discarded because a tag was invalidated mid-render.');
+  out.push('# TYPE page_cache_stale_total counter');
+  out.push(`page_cache_stale_total ${stats.stale}`);
+  out.push('# HELP page_cache_evictions_total Entries evicted by the LRU bounds.');
+  out.push('# TYPE page_cache_evictions_total counter');
+  out.push(`page_cache_evictions_total ${stats.evictions}`);
+  out.push('# HELP page_cache_invalidations_total Tags invalidated.');
+  out.push('# TYPE page_cache_invalidations_total counter');
+  out.push(`page_cache_invalidations_total ${stats.invalidations}`);
+  out.push('# HELP page_cache_bytes Cached HTML held by this process.');
+  out.push('# TYPE page_cache_bytes gauge');
+  out.push(`page_cache_bytes ${stats.bytes}`);
+  out.push('# HELP page_cache_entries Cached pages held by this process.');
+  out.push('# TYPE page_cache_entries gauge');
+  out.push(`page_cache_entries ${entries.size}`);
+});
+
+module.exports = { enabled, page, invalidate, servePrimary, stats };
+"""
+
+def write_file(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        ts = datetime.now().strftime("%Y%m%d-%H%M%S")
+        backup = f"{path}.bak-{ts}"
+        try:
+            with open(path, "rb") as rf, open(backup, "wb") as wf:
+                wf.write(rf.read())
+            print(f"• Backed up existing file to {backup}")
+        except Exception as e:
+            print(f"! Could not backup {path}: {e}")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    print(f"✓ Wrote {path}")
+
+def main():
+    target = sys.argv[1] if len(sys.argv) > 1 else os.getcwd()
+    target = os.path.abspath(target)
+    write_file(os.path.join(target, "src", "utils", "pagecache.js"), PAGECACHE_JS)
+
+    print("\nNext steps:")
+    print("  1) Tune PAGE_CACHE_MB / PAGE_CACHE_TTL_SEC in .env (PAGE_CACHE_MB=0 disables)")
+    print("  2) Restart the server")
+
+if __name__ == "__main__":
+    main()
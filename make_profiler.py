@@ -0,0 +1,165 @@
+# make_profiler.py
+# Writes src/utils/profiler.js — on-demand CPU / heap profiling for admins.
+#
+# Usage:
+#   python make_profiler.py              # writes into current directory
+#   python make_profiler.py /path/to/app # writes into given directory
+#
+# Only active when PROFILING_ENABLED=true; otherwise every route 404s and no
+# inspector session or GC observer is created. Mounted on the admin router:
+#   POST /admin/profile/cpu?seconds=10  -> sampling CPU profile (.cpuprofile)
+#   POST /admin/profile/heap            -> heap snapshot (.heapsnapshot)
+#   GET  /admin/profile/gc              -> heap + GC statistics (JSON)
+#   GET  /admin/profile                 -> list captured artifacts
+# Artifacts go to PROFILE_DIR (default ./profiles). Summarize a CPU profile with
+#   python profile_summary.py profiles/cpu-<pid>-<ts>.cpuprofile
+
+import os
+import sys
+from datetime import datetime
+
+PROFILER_JS = r"""// src/utils/profiler.js
+// Live CPU / heap profiling without restarting under --inspect.
+// Gated by PROFILING_ENABLED; artifacts are written to PROFILE_DIR.
+const fs = require('fs');
+const path = require('path');
+const v8 = require('v8');
+const express = require('express');
+
+const config = require('../config');
+
+const enabled = config.PROFILING_ENABLED;
+const DIR = path.resolve(__dirname, '..', '..', config.PROFILE_DIR);
+const MAX_SECONDS = 60;
+
+/* ---------- GC statistics ---------- */
+const gc = { count: 0, totalMs: 0, maxMs: 0, byKind: {} };
+
+if (enabled) {
+  const { PerformanceObserver, constants: c } = require('perf_hooks');
+  const KINDS = {
+    [c.NODE_PERFORMANCE_GC_MINOR]: 'minor',
+    [c.NODE_PERFORMANCE_GC_MAJOR]: 'major',
+    [c.NODE_PERFORMANCE_GC_INCREMENTAL]: 'incremental',
+    [c.NODE_PERFORMANCE_GC_WEAKCB]: 'weakcb',
+  };
+  new PerformanceObserver((list) => {
+    for (const e of list.getEntries()) {
+      const kind = KINDS[e.detail ? e.detail.kind : e.kind] || 'other';
+      gc.count++;
+      gc.totalMs += e.duration;
+      gc.maxMs = Math.max(gc.maxMs, e.duration);
+      gc.byKind[kind] = (gc.byKind[kind] || 0) + 1;
+    }
+  }).observe({ entryTypes: ['gc'] });
+}
+
+/* ---------- helpers ---------- */
+function artifact(kind, ext) {
+  fs.mkdirSync(DIR, { recursive: true });
+  const ts = new Date().toISOString().replace(/[:.]/g, '-');
+  return path.join(DIR, `${kind}-${process.pid}-${ts}.${ext}`);
+}
+
+let cpuBusy = false;
+
+function cpuProfile(seconds) {
+  const inspector = require('inspector');
+  const session = new inspector.Session();
+  session.connect();
+  const post = (method, params) => new Promise((resolve, reject) => {
+    session.post(method, params, (err, res) => (err ? reject(err) : resolve(res)));
+  });
+  return post('Profiler.enable')
+    .then(() => post('Profiler.setSamplingInterval', { interval: 1000 })) // µs
+    .then(() => post('Profiler.start'))
+    .then(() => new Promise((resolve) => setTimeout(resolve, seconds * 1000)))
+    .then(() => post('Profiler.stop'))
+    .then(({ profile }) => {
+      const file = artifact('cpu', 'cpuprofile');
+      fs.writeFileSync(file, JSON.stringify(profile));
+      return file;
+    })
+    .finally(() => session.disconnect());
+}
+
+/* ---------- routes ---------- */
+function router() {
+  const r = express.Router();
+  if (!enabled) {
+    r.use((_req, res) => res.status(404).json({ error: 'Profiling disabled (set PROFILING_ENABLED=true)' }));
+    return r;
+  }
+
+  // Samples this worker only; with cluster workers, repeat until you hit the busy one.
+  r.post('/cpu', (req, res, next) => {
+    if (cpuBusy) return res.status(409).json({ error: 'A CPU profile is already running' });
+    const seconds = Math.min(MAX_SECONDS, Math.max(1, Number(req.query.seconds) || 10));
+    cpuBusy = true;
+    cpuProfile(seconds)
+      .then((file) => res.json({ ok: true, pid: process.pid, seconds, file: path.basename(file) }))
+      .catch(next)
+      .finally(() => { cpuBusy = false; });
+  });
+
+  // Blocks this worker while the snapshot is written (roughly 1-2x heap size on disk).
+  r.post('/heap', (_req, res) => {
+    const file = v8.writeHeapSnapshot(artifact('heap', 'heapsnapshot'));
+    res.json({ ok: true, pid: process.pid, file: path.basename(file), bytes: fs.statSync(file).size });
+  });
+
+  r.get('/gc', (_req, res) => {
+    const mem = process.memoryUsage();
+    res.json({
+      pid: process.pid,
+      uptimeSec: Math.round(process.uptime()),
+      memory: mem,
+      heap: v8.getHeapStatistics(),
+      spaces: v8.getHeapSpaceStatistics().map((s) => ({
+        name: s.space_name, used: s.space_used_size, size: s.space_size,
+      })),
+      gc: { ...gc, totalMs: Math.round(gc.totalMs * 100) / 100, maxMs: Math.round(gc.maxMs * 100) / 100 },
+    });
+  });
+
+  r.get('/', (_req, res) => {
+    const files = fs.existsSync(DIR) ? fs.readdirSync(DIR) : [];
+    res.json({
+      dir: DIR,
+      files: files.map((f) => ({ file: f, bytes: fs.statSync(path.join(DIR, f)).size })),
+    });
+  });
+
+  return r;
+}
+
+module.exports = { enabled, router, cpuProfile };
+"""
+
+def write_file(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        ts = datetime.now().strftime("%Y%m%d-%H%M%S")
+        backup = f"{path}.bak-{ts}"
+        try:
+            with open(path, "rb") as rf, open(backup, "wb") as wf:
+                wf.write(rf.read())
+            print(f"• Backed up existing file to {backup}")
+        except Exception as e:
+            print(f"! Could not backup {path}: {e}")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    print(f"✓ Wrote {path}")
+
+def main():
+    target = sys.argv[1] if len(sys.argv) > 1 else os.getcwd()
+    target = os.path.abspath(target)
+    write_file(os.path.join(target, "src", "utils", "profiler.js"), PROFILER_JS)
+
+    print("\nNext steps:")
+    print("  1) Set PROFILING_ENABLED=true in .env and restart")
+    print("  2) As admin: POST /admin/profile/cpu?seconds=10")
+    print("  3) python profile_summary.py profiles/<file>.cpuprofile")
+
+if __name__ == "__main__":
+    main()
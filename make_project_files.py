@@ -1,5 +1,5 @@
 # make_project_files.py
-# Creates/updates .gitignore, README.md, .env, and .env.example with backups.
+# Creates/updates .gitignore and README.md with backups (.env and .env.example: make_env.py).
 
 import os
 from datetime import datetime
@@ -39,31 +39,30 @@ Thumbs.db
 dist/
 build/
 
+# ---- Local data (SQLite DB + backup_db.py snapshots) ----
+data.sqlite*
+backups/
+
+# ---- Profiles (make_profiler.py) ----
+profiles/
+
+# ---- Compiled config (make_config.py; holds .env secrets) ----
+src/config.js
+
+# ---- Docs build manifest (make_docs.py) ----
+.docs-build.json
+
 # ---- Backups & temp ----
 *.bak
 *.tmp
 *.log
 '''
 
-README = '''# School Portal Upgrade 5
-
-A Node.js + Express + SQLite school portal with **Admin / Teacher / Student / Parent** portals, **attendance**, **employment/jobs**, **CSV import**, **PIN result view**, **printable report cards**, and **email/SMS notifications** (email via Gmail SMTP App Password; SMS via Twilio if configured).
-
----
-
-## 🔧 Requirements
-
-- Node.js 18+ (Termux/Android or Windows/Mac/Linux)
-- npm (comes with Node)
-- SQLite (bundled via `sqlite3` package; no external install needed)
-
----
-
-## 📦 Install
+# README text lives in readme.py (make_docs.py also renders it as docs/guide.html)
+from readme import lines as README_LINES
 
-```bash
-# 1) go to the project folder
-cd school-portal-upgrade-5
+README = "\n".join(README_LINES) + "\n"
 
-# 2) install dependencies
-npm install
\ No newline at end of file
+if __name__ == "__main__":
+    backup_and_write(".gitignore", GITIGNORE)
+    backup_and_write("README.md", README)
@@ -0,0 +1,164 @@
+# make_ratelimit.py
+# Writes src/utils/ratelimit.js — token-bucket rate limiting for auth and
+# PIN result routes.
+#
+# Usage:
+#   python make_ratelimit.py              # writes into current directory
+#   python make_ratelimit.py /path/to/app # writes into given directory
+#
+# Buckets are kept per IP and per account (email / student id) in an LRU that
+# never grows past RATE_LIMIT_MAX_KEYS entries. A whole school can sit behind
+# one NAT address, so the IP buckets get their own, larger capacity; behind a
+# reverse proxy set TRUST_PROXY so req.ip is the client rather than the proxy. With cluster workers
+# (WEB_CONCURRENCY > 1) the primary process owns the buckets and workers ask it
+# over IPC, so a brute-force client can't multiply its budget by the number of
+# workers. Excess requests get 429 before any hashing or DB lookup happens.
+#
+# Env knobs:
+#   RATE_LIMIT_AUTH_PER_MIN      login/register/reset attempts per account per minute (default 10)
+#   RATE_LIMIT_AUTH_PER_MIN_IP   the same per client IP (default 120)
+#   RATE_LIMIT_PIN_PER_MIN       PIN result lookups per student per minute (default 5)
+#   RATE_LIMIT_PIN_PER_MIN_IP    the same per client IP (default 60)
+#   RATE_LIMIT_MAX_KEYS       LRU size (default 50000)
+
+import os
+import sys
+from datetime import datetime
+
+RATELIMIT_JS = r"""// src/utils/ratelimit.js
+// Token buckets in a size-bounded LRU. In cluster mode the primary owns the
+// buckets (see servePrimary) and workers ask it over IPC.
+const cluster = require('cluster');
+const config = require('../config');
+
+const MAX_KEYS = config.RATE_LIMIT_MAX_KEYS;
+const IPC_TIMEOUT_MS = 50;
+
+/* ---------- LRU of buckets ---------- */
+// Map keeps insertion order: re-inserting on access makes the first key the LRU.
+const buckets = new Map(); // key -> { tokens, at }
+
+// perMinute is both the bucket size and the refill rate
+function take(key, perMinute, now = Date.now()) {
+  const capacity = perMinute;
+  const perSec = perMinute / 60;
+  let b = buckets.get(key);
+  if (b) {
+    buckets.delete(key);
+    b.tokens = Math.min(capacity, b.tokens + ((now - b.at) / 1000) * perSec);
+    b.at = now;
+  } else {
+    b = { tokens: capacity, at: now };
+    if (buckets.size >= MAX_KEYS) buckets.delete(buckets.keys().next().value);
+  }
+  buckets.set(key, b);
+  if (b.tokens >= 1) {
+    b.tokens -= 1;
+    return 0;
+  }
+  return Math.ceil((1 - b.tokens) / perSec); // seconds until the next token
+}
+
+// charges: [[key, perMinute], ...]. Every bucket must have a token; only spend
+// them if all of them allow it.
+function takeAll(charges) {
+  const now = Date.now();
+  let wait = 0;
+  for (const [key, perMinute] of charges) {
+    const perSec = perMinute / 60;
+    const b = buckets.get(key);
+    const tokens = b ? Math.min(perMinute, b.tokens + ((now - b.at) / 1000) * perSec) : perMinute;
+    if (tokens < 1) wait = Math.max(wait, Math.ceil((1 - tokens) / perSec));
+  }
+  if (wait) return wait;
+  for (const [key, perMinute] of charges) take(key, perMinute, now);
+  return 0;
+}
+
+/* ---------- cluster IPC ---------- */
+let seq = 0;
+const pending = new Map(); // id -> resolve
+
+if (cluster.isWorker) {
+  process.on('message', (msg) => {
+    if (!msg || msg.cmd !== 'ratelimit:result') return;
+    const resolve = pending.get(msg.id);
+    if (resolve) {
+      pending.delete(msg.id);
+      resolve(msg.wait);
+    }
+  });
+}
+
+function ask(charges) {
+  if (!cluster.isWorker || !process.connected) return Promise.resolve(takeAll(charges));
+  return new Promise((resolve) => {
+    const id = ++seq;
+    const timer = setTimeout(() => {
+      // Primary busy or gone: decide locally rather than stall the request
+      pending.delete(id);
+      resolve(takeAll(charges));
+    }, IPC_TIMEOUT_MS);
+    pending.set(id, (wait) => { clearTimeout(timer); resolve(wait); });
+    process.send({ cmd: 'ratelimit:take', id, charges });
+  });
+}
+
+// Call once in the cluster primary.
+function servePrimary(clusterModule = cluster) {
+  clusterModule.on('message', (worker, msg) => {
+    if (!msg || msg.cmd !== 'ratelimit:take') return;
+    const wait = takeAll(msg.charges);
+    worker.send({ cmd: 'ratelimit:result', id: msg.id, wait });
+  });
+}
+
+/* ---------- Express middleware ---------- */
+/**
+ * limit({ name, perMinute, perMinuteIp, account }) — `account(req)` returns an
+ * account id (email, student id…) or null; requests are charged to the IP
+ * bucket (perMinuteIp, default perMinute) and the account bucket (perMinute).
+ */
+function limit({ name, perMinute, perMinuteIp = perMinute, account = () => null }) {
+  return (req, res, next) => {
+    const charges = [[`${name}:ip:${req.ip}`, perMinuteIp]];
+    const acct = account(req);
+    if (acct) charges.push([`${name}:acct:${String(acct).toLowerCase()}`, perMinute]);
+    ask(charges).then((wait) => {
+      if (!wait) return next();
+      res.set('Retry-After', String(wait));
+      res.status(429).json({ error: 'Too many attempts, try again later', retryAfter: wait });
+    }, next);
+  };
+}
+
+module.exports = { limit, servePrimary, take, takeAll, buckets };
+"""
+
+def write_file(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        ts = datetime.now().strftime("%Y%m%d-%H%M%S")
+        backup = f"{path}.bak-{ts}"
+        try:
+            with open(path, "rb") as rf, open(backup, "wb") as wf:
+                wf.write(rf.read())
+            print(f"• Backed up existing file to {backup}")
+        except Exception as e:
+            print(f"! Could not backup {path}: {e}")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    print(f"✓ Wrote {path}")
+
+def main():
+    target = sys.argv[1] if len(sys.argv) > 1 else os.getcwd()
+    target = os.path.abspath(target)
+    write_file(os.path.join(target, "src", "utils", "ratelimit.js"), RATELIMIT_JS)
+
+    print("\nNext steps:")
+    print("  1) Tune RATE_LIMIT_*_PER_MIN (per account) and *_PER_MIN_IP (per IP) in .env")
+    print("     Behind a reverse proxy, set TRUST_PROXY too (e.g. loopback)")
+    print("  2) Restart the server")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# make_sessionstore.py
+# Writes src/utils/sessionstore.js — an express-session store on the app's
+# SQLite database.
+#
+# Usage:
+#   python make_sessionstore.py              # writes into current directory
+#   python make_sessionstore.py /path/to/app # writes into given directory
+#
+# With WEB_CONCURRENCY > 1 the primary hands connections to workers round-robin,
+# so a session kept in one worker's memory is missing on the next request.
+# Sessions live in a `sessions` table instead: every worker sees the same
+# logins, and they survive restarts (including a SIGUSR2 rolling restart).
+# Reads are one primary-key lookup; the sliding expiry is only written back once
+# it has moved by a minute, so browsing doesn't turn every GET into a write.
+#
+# Env knobs:
+#   SESSION_STORE   sqlite (default) or memory; memory forces a single worker
+
+import os
+import sys
+from datetime import datetime
+
+SESSIONSTORE_JS = r"""// src/utils/sessionstore.js
+// express-session store shared by all cluster workers through SQLite.
+const session = require('express-session');
+
+const TOUCH_SLACK_MS = 60 * 1000; // skip expiry writes smaller than this
+const PRUNE_INTERVAL_MS = 10 * 60 * 1000;
+const DEFAULT_TTL_MS = 24 * 60 * 60 * 1000; // sessions without cookie.expires
+
+function expiresAt(sess) {
+  const exp = sess && sess.cookie && sess.cookie.expires;
+  return exp ? new Date(exp).getTime() : Date.now() + DEFAULT_TTL_MS;
+}
+
+class SqliteStore extends session.Store {
+  constructor(db) {
+    super();
+    db.exec(`
+      CREATE TABLE IF NOT EXISTS sessions (
+        sid TEXT PRIMARY KEY,
+        expires INTEGER NOT NULL,
+        sess TEXT NOT NULL
+      ) WITHOUT ROWID;
+      CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions(expires);
+    `);
+    this.stmts = {
+      get: db.prepare('SELECT sess FROM sessions WHERE sid = ? AND expires > ?'),
+      set: db.prepare(`INSERT INTO sessions (sid, expires, sess) VALUES (?, ?, ?)
+        ON CONFLICT (sid) DO UPDATE SET expires = excluded.expires, sess = excluded.sess`),
+      destroy: db.prepare('DELETE FROM sessions WHERE sid = ?'),
+      touch: db.prepare('UPDATE sessions SET expires = ? WHERE sid = ? AND expires < ?'),
+      prune: db.prepare('DELETE FROM sessions WHERE expires <= ?'),
+    };
+    this.prune();
+    setInterval(() => this.prune(), PRUNE_INTERVAL_MS).unref();
+  }
+
+  get(sid, cb) {
+    try {
+      const row = this.stmts.get.get(sid, Date.now());
+      cb(null, row ? JSON.parse(row.sess) : null);
+    } catch (e) {
+      cb(e);
+    }
+  }
+
+  set(sid, sess, cb) {
+    try {
+      this.stmts.set.run(sid, expiresAt(sess), JSON.stringify(sess));
+      cb && cb(null);
+    } catch (e) {
+      cb && cb(e);
+    }
+  }
+
+  destroy(sid, cb) {
+    try {
+      this.stmts.destroy.run(sid);
+      cb && cb(null);
+    } catch (e) {
+      cb && cb(e);
+    }
+  }
+
+  touch(sid, sess, cb) {
+    try {
+      const exp = expiresAt(sess);
+      this.stmts.touch.run(exp, sid, exp - TOUCH_SLACK_MS);
+      cb && cb(null);
+    } catch (e) {
+      cb && cb(e);
+    }
+  }
+
+  prune() {
+    try {
+      this.stmts.prune.run(Date.now());
+    } catch (e) {
+      console.warn('⚠️  Session prune failed:', e.message); // retried next interval
+    }
+  }
+}
+
+module.exports = { SqliteStore };
+"""
+
+def write_file(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        ts = datetime.now().strftime("%Y%m%d-%H%M%S")
+        backup = f"{path}.bak-{ts}"
+        try:
+            with open(path, "rb") as rf, open(backup, "wb") as wf:
+                wf.write(rf.read())
+            print(f"• Backed up existing file to {backup}")
+        except Exception as e:
+            print(f"! Could not backup {path}: {e}")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    print(f"✓ Wrote {path}")
+
+def main():
+    target = sys.argv[1] if len(sys.argv) > 1 else os.getcwd()
+    target = os.path.abspath(target)
+    write_file(os.path.join(target, "src", "utils", "sessionstore.js"), SESSIONSTORE_JS)
+
+    print("\nNext steps:")
+    print("  1) Keep SESSION_STORE=sqlite in .env (memory only for a single worker)")
+    print("  2) Restart the server (existing in-memory logins are dropped once)")
+
+if __name__ == "__main__":
+    main()
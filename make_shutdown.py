@@ -0,0 +1,198 @@
+# make_shutdown.py
+# Writes src/utils/shutdown.js — graceful shutdown, connection draining and
+# rolling cluster restarts.
+#
+# Usage:
+#   python make_shutdown.py              # writes into current directory
+#   python make_shutdown.py /path/to/app # writes into given directory
+#
+# On SIGTERM / SIGINT a worker (or the single process):
+#   1. marks itself draining (/health/ready -> 503, new responses get
+#      `Connection: close`)
+#   2. stops accepting, closes idle keep-alive sockets and lets in-flight
+#      requests finish (up to SHUTDOWN_TIMEOUT_MS, then cuts the rest)
+#   3. runs shutdown hooks newest-first (health probes off, queued work
+#      flushed, SQLite WAL checkpointed and closed last) and exits
+#
+# With WEB_CONCURRENCY > 1 the primary supervises the workers:
+#   kill -TERM <primary>   drain every worker, then exit
+#   kill -USR2 <primary>   rolling restart: start a fresh worker, wait until it
+#                          listens, then drain one old worker; repeat. A fresh
+#                          worker that crashes on boot aborts the roll and the
+#                          old workers keep serving.
+
+import os
+import sys
+from datetime import datetime
+
+SHUTDOWN_JS = r"""// src/utils/shutdown.js
+// Graceful shutdown for workers (graceful) and the cluster primary (supervise).
+const cluster = require('cluster');
+const config = require('../config');
+
+const TIMEOUT_MS = config.SHUTDOWN_TIMEOUT_MS;
+
+const drainHooks = [];    // run when draining starts
+const shutdownHooks = []; // run after the server has closed, newest first
+let draining = false;
+
+// fn() is called once when the process starts draining (e.g. fail readiness).
+function onDrain(fn) {
+  drainHooks.push(fn);
+}
+
+// fn() may return a promise; hooks run in reverse order of registration, so
+// db.js (required first) checkpoints and closes the database last.
+function onShutdown(fn) {
+  shutdownHooks.push(fn);
+}
+
+function isDraining() {
+  return draining;
+}
+
+/* ---------- worker / single process ---------- */
+/**
+ * graceful(server) — drain `server` on SIGTERM/SIGINT, then run the shutdown
+ * hooks and exit. Node keeps busy keep-alive sockets open after close(), so
+ * pending responses are marked `Connection: close` and idle sockets are
+ * closed as each response finishes.
+ */
+function graceful(server, { timeoutMs = TIMEOUT_MS } = {}) {
+  const active = new Set(); // responses in flight
+  // Prepended: Express answers some requests synchronously, and setting a
+  // header after that throws ERR_HTTP_HEADERS_SENT
+  server.prependListener('request', (_req, res) => {
+    if (draining && !res.headersSent) res.setHeader('Connection', 'close');
+    active.add(res);
+    res.on('close', () => {
+      active.delete(res);
+      if (draining) server.closeIdleConnections();
+    });
+  });
+
+  let finished = false;
+  async function finish(code) {
+    if (finished) return;
+    finished = true;
+    for (const fn of shutdownHooks.slice().reverse()) {
+      try {
+        await fn();
+      } catch (e) {
+        console.error('Shutdown hook failed:', e);
+      }
+    }
+    process.exit(code);
+  }
+
+  function drain(signal) {
+    if (draining) return;
+    draining = true;
+    console.log(`⏳ ${signal}: draining ${active.size} request(s) (pid ${process.pid})`);
+    for (const fn of drainHooks) {
+      try { fn(); } catch (e) { console.error('Drain hook failed:', e); }
+    }
+    for (const res of active) if (!res.headersSent) res.setHeader('Connection', 'close');
+    server.close(() => finish(0));
+    server.closeIdleConnections();
+    setTimeout(() => {
+      console.warn(`⚠️  ${active.size} request(s) still running after ${timeoutMs} ms; closing them`);
+      server.closeAllConnections();
+      finish(1);
+    }, timeoutMs).unref();
+  }
+
+  process.on('SIGTERM', () => drain('SIGTERM'));
+  process.on('SIGINT', () => drain('SIGINT'));
+}
+
+/* ---------- cluster primary ---------- */
+function supervise(workers) {
+  let stopping = false;
+  let rolling = false;
+  const retiring = new Set(); // worker ids we asked to exit
+
+  cluster.on('exit', (worker, code, signal) => {
+    if (stopping) {
+      if (!Object.keys(cluster.workers).length) process.exit(0);
+      return;
+    }
+    if (retiring.delete(worker.id) || worker.booting) return;
+    console.warn(`⚠️  Worker ${worker.process.pid} exited (${signal || code}); restarting`);
+    cluster.fork();
+  });
+
+  function retire(worker) {
+    retiring.add(worker.id);
+    worker.process.kill('SIGTERM');
+    return new Promise((resolve) => worker.once('exit', resolve));
+  }
+
+  async function roll() {
+    if (rolling || stopping) return;
+    rolling = true;
+    const old = Object.values(cluster.workers);
+    console.log(`↻ Rolling restart of ${old.length} worker(s)`);
+    for (const worker of old) {
+      const fresh = cluster.fork();
+      fresh.booting = true;
+      const up = await new Promise((resolve) => {
+        fresh.once('listening', () => resolve(true));
+        fresh.once('exit', () => resolve(false));
+      });
+      fresh.booting = false;
+      if (!up) {
+        console.error('❌ New worker failed to start; keeping the old workers');
+        break;
+      }
+      await retire(worker);
+    }
+    rolling = false;
+  }
+
+  function stop(signal) {
+    if (stopping) return;
+    stopping = true;
+    console.log(`⏳ ${signal}: draining ${Object.keys(cluster.workers).length} worker(s)`);
+    for (const worker of Object.values(cluster.workers)) worker.process.kill('SIGTERM');
+    // Workers cut their own stragglers at SHUTDOWN_TIMEOUT_MS; this is a backstop
+    setTimeout(() => process.exit(1), TIMEOUT_MS + 5000).unref();
+  }
+
+  process.on('SIGTERM', () => stop('SIGTERM'));
+  process.on('SIGINT', () => stop('SIGINT'));
+  process.on('SIGUSR2', roll);
+
+  for (let i = 0; i < workers; i++) cluster.fork();
+  console.log(`✅ Primary ${process.pid} started ${workers} workers (kill -USR2 ${process.pid} for a rolling restart)`);
+}
+
+module.exports = { graceful, supervise, onDrain, onShutdown, isDraining };
+"""
+
+def write_file(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        ts = datetime.now().strftime("%Y%m%d-%H%M%S")
+        backup = f"{path}.bak-{ts}"
+        try:
+            with open(path, "rb") as rf, open(backup, "wb") as wf:
+                wf.write(rf.read())
+            print(f"• Backed up existing file to {backup}")
+        except Exception as e:
+            print(f"! Could not backup {path}: {e}")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    print(f"✓ Wrote {path}")
+
+def main():
+    target = sys.argv[1] if len(sys.argv) > 1 else os.getcwd()
+    target = os.path.abspath(target)
+    write_file(os.path.join(target, "src", "utils", "shutdown.js"), SHUTDOWN_JS)
+
+    print("\nNext steps:")
+    print("  1) Tune KEEP_ALIVE_TIMEOUT_MS / SHUTDOWN_TIMEOUT_MS in .env")
+    print("  2) Stop with SIGTERM (not SIGKILL) so requests drain")
+
+if __name__ == "__main__":
+    main()
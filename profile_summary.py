@@ -0,0 +1,101 @@
+# profile_summary.py
+# Summarizes a V8 .cpuprofile (from POST /admin/profile/cpu) as a top-N table.
+#
+# Self time  = time the function itself was on top of the stack.
+# Total time = time it was anywhere on the stack (counted once per sample,
+#              so recursion doesn't inflate it).
+#
+# Usage:
+#   python profile_summary.py profiles/cpu-1234-2025-08-19T03-17-46-000Z.cpuprofile
+#   python profile_summary.py PROFILE --top 30 --sort total
+#   python profile_summary.py PROFILE --app-only     # hide node internals / node_modules
+
+import argparse
+import json
+import os
+import sys
+from collections import defaultdict
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def frame_key(node, root_dir):
+    cf = node["callFrame"]
+    name = cf.get("functionName") or "(anonymous)"
+    url = cf.get("url") or ""
+    if url.startswith("file://"):
+        url = url[len("file://"):]
+    if root_dir and url.startswith(root_dir):
+        url = os.path.relpath(url, root_dir)
+    where = f"{url}:{cf.get('lineNumber', -1) + 1}" if url else ""
+    return name, where
+
+def is_app_frame(where):
+    return bool(where) and not where.startswith(("node:", "internal/")) and "node_modules" not in where
+
+def summarize(profile, root_dir=None):
+    """Returns (rows, total_ms) with rows = [(name, where, self_ms, total_ms)]."""
+    nodes = {n["id"]: n for n in profile["nodes"]}
+    parent = {}
+    for n in profile["nodes"]:
+        for child in n.get("children", []):
+            parent[child] = n["id"]
+
+    samples = profile.get("samples", [])
+    deltas = profile.get("timeDeltas", [])
+    # timeDeltas[i] is the gap before sample i, so sample i lasts until i+1
+    durations = [(deltas[i + 1] if i + 1 < len(deltas) else 0) / 1000.0 for i in range(len(samples))]
+
+    self_ms = defaultdict(float)
+    total_ms = defaultdict(float)
+    stack_cache = {}
+
+    def stack_keys(node_id):
+        if node_id not in stack_cache:
+            keys = set()
+            nid = node_id
+            while nid is not None:
+                keys.add(frame_key(nodes[nid], root_dir))
+                nid = parent.get(nid)
+            stack_cache[node_id] = keys
+        return stack_cache[node_id]
+
+    for node_id, ms in zip(samples, durations):
+        self_ms[frame_key(nodes[node_id], root_dir)] += ms
+        for key in stack_keys(node_id):
+            total_ms[key] += ms
+
+    overall = sum(durations)
+    rows = [(name, where, self_ms[(name, where)], total_ms[(name, where)])
+            for (name, where) in total_ms
+            if name not in ("(root)",)]
+    return rows, overall
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Top self-time functions in a .cpuprofile")
+    ap.add_argument("profile")
+    ap.add_argument("--top", type=int, default=20)
+    ap.add_argument("--sort", choices=["self", "total"], default="self")
+    ap.add_argument("--app-only", action="store_true", help="only frames from the project's own files")
+    ap.add_argument("--root", default=os.getcwd(), help="strip this prefix from file paths")
+    args = ap.parse_args(argv)
+
+    rows, overall = summarize(load(args.profile), os.path.abspath(args.root) + os.sep)
+    if args.app_only:
+        rows = [r for r in rows if is_app_frame(r[1])]
+    idx = 2 if args.sort == "self" else 3
+    rows.sort(key=lambda r: r[idx], reverse=True)
+
+    if not overall:
+        raise SystemExit("❌ Profile has no samples")
+    print(f"{os.path.basename(args.profile)}: {overall:.0f} ms sampled\n")
+    print(f"{'self ms':>9} {'self%':>6} {'total ms':>9} {'total%':>6}  function")
+    for name, where, s, t in rows[:args.top]:
+        print(f"{s:9.1f} {100 * s / overall:5.1f}% {t:9.1f} {100 * t / overall:5.1f}%  {name}  {where}")
+
+if __name__ == "__main__":
+    try:
+        main()
+    except BrokenPipeError:
+        sys.stderr.close()
@@ -1,5 +1,7 @@
 # readme_gen.py
 # Writes README.md safely without using triple-quoted strings.
+# `lines` is the single README source: make_project_files.py writes the same
+# text and make_docs.py renders it as docs/guide.html.
 
 import os
 from datetime import datetime
@@ -38,23 +40,53 @@ lines = [
 "## Scripts",
 "- `npm start` — start Express server (server.js)",
 "- `npm run seed` — create initial admin user from `.env` values",
+"- `python make_config.py` — validate `.env` and compile `src/config.js` (`--check` validates only)",
+"- `python watch.py` — dev loop: regenerate changed templates, restart node",
+"- `python make_docs.py` — build `docs/` (minified, CSS inlined, search index) and README.md; only changed pages are rewritten",
+"- `python run_integration.py` — router suites in parallel, one throwaway server + DB each, seeded with a logged-in session per role",
+"- `python profile_summary.py profiles/<file>.cpuprofile` — top functions by self/total time",
+"- `python audit_queries.py` — EXPLAIN QUERY PLAN audit; fails if `attendance`/`job_apps` queries scan",
+"- `python counters.py check` — compare dashboard counters with a full recount (`repair` fixes drift)",
+"- `python backup_db.py backup` — online SQLite snapshot to `backups/` (also `list`, `verify`, `restore`)",
+"- `python export_data.py attendance --from YYYY-MM-DD --to YYYY-MM-DD --class JSS1` — streaming CSV/NDJSON export (also `job_apps --job ID`)",
 "",
 "## Required Env (see .env.example)",
+"- `.env` is compiled into `src/config.js` by `python make_config.py` (run automatically by `make_env.py`,",
+"  `termux_setup.py` and `watch.py`). Bad values fail the build; the server refuses to start if `.env`",
+"  changed since. Real environment variables still override `.env` and are validated the same way.",
 "- `SITE_NAME`, `PORT`, `SESSION_SECRET`",
+"- `SESSION_STORE` — `sqlite` (default; logins shared by all workers and kept across restarts) or `memory` (forces one worker)",
 "- `SMTP_HOST`, `SMTP_PORT`, `SMTP_SECURE`, `SMTP_USER`, `SMTP_PASS`, `FROM_EMAIL`",
 "- Optional: `TWILIO_ACCOUNT_SID`, `TWILIO_AUTH_TOKEN`, `TWILIO_FROM`",
 "- `BASE_URL` (for links in emails), `NODE_ENV`",
+"- Performance profile (written by `python make_env.py`, `--profile termux|small-vps|server`):",
+"  `WEB_CONCURRENCY`, `SQLITE_CACHE_MB`, `SQLITE_MMAP_MB`, `MAX_CONNECTIONS`, `LISTEN_BACKLOG`, `COMPRESSION_THRESHOLD`, `KEEP_ALIVE_TIMEOUT_MS`",
+"- Shutdown: `SHUTDOWN_TIMEOUT_MS`, `HEADERS_TIMEOUT_MS`, `REQUEST_TIMEOUT_MS`",
+"- Rate limits: `RATE_LIMIT_AUTH_PER_MIN`, `RATE_LIMIT_PIN_PER_MIN` (per account),",
+"  `RATE_LIMIT_AUTH_PER_MIN_IP`, `RATE_LIMIT_PIN_PER_MIN_IP` (per client IP), `RATE_LIMIT_MAX_KEYS`",
+"- `TRUST_PROXY` — behind a reverse proxy: hop count, `loopback` or proxy addresses (empty = none)",
+"- Dashboard page cache: `PAGE_CACHE_MB` (0 = off), `PAGE_CACHE_MAX_ENTRIES`, `PAGE_CACHE_TTL_SEC`",
+"- Optional: `METRICS_ENABLED=true` — `Server-Timing` headers + `/metrics` (scrape with `METRICS_TOKEN`)",
+"- Optional: `PROFILING_ENABLED=true`, `PROFILE_DIR` — admin CPU/heap profiling",
 "",
 "## Default Routes",
 "- `/` — Home / login",
 "- `/admin` — Admin dashboard",
+"- `/admin/overview?date=YYYY-MM-DD` — users per role, jobs, applications per job, attendance for the day (admin only)",
+"- `/admin/export/attendance.csv`, `/admin/export/job_apps.ndjson` — streamed, gzipped exports (admin only)",
+"- `/admin/profile/cpu?seconds=10`, `/admin/profile/heap`, `/admin/profile/gc` — live profiling (admin only, when enabled)",
 "- `/teacher` — Teacher dashboard",
-"- `/student` — Student dashboard",
-"- `/parent` — Parent dashboard",
+"- `POST /teacher/attendance/bulk` — whole-class roll call `{ date, class_name?, records: [{ student_id, status }] }`",
+"- `/student` — Student dashboard (attendance; cached per user until it changes)",
+"- `/parent` — Parent dashboard (each linked child's attendance; cached the same way)",
 "- `/jobs` — Jobs portal",
-"- `/health` — health JSON",
+"- `/health`, `/health/ready` — readiness from cached DB/session/SMTP probes",
+"- `/health/live` — liveness (process + probe loop)",
+"- `/metrics` — Prometheus text metrics (when enabled; needs `Authorization: Bearer $METRICS_TOKEN`)",
 "",
 "## Notes",
+"- Stop with SIGTERM/Ctrl+C: in-flight requests drain, the SQLite WAL is checkpointed, then the process exits.",
+"- With `WEB_CONCURRENCY` > 1, `kill -USR2 <primary pid>` restarts workers one at a time without dropping requests.",
 "- SQLite DB file is created automatically.",
 "- If email/SMS env vars are missing, messages are logged to the console.",
 "- Print-friendly report card at `/report/:studentId`.",
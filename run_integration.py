@@ -0,0 +1,346 @@
+# run_integration.py
+# Parallel integration tests: one isolated server per suite.
+#
+# Each role-router suite runs in its own process from a pool. The process picks
+# a free port, starts `node server.js` with its own temporary SQLite database
+# (DB_PATH) and WEB_CONCURRENCY=1, waits for /health/ready, seeds FIXTURE_SQL
+# plus one logged-in session per role, runs its checks over HTTP and tears the
+# server and temp dir down again. Suites never share state, so they can all run
+# at once.
+#
+# Sessions are rows in the SQLite session store (SESSION_STORE=sqlite) with a
+# cookie signed like express-session's, so checks can act as admin, teacher,
+# student or parent without a login form.
+#
+# Usage:
+#   python run_integration.py                  # all suites, in parallel
+#   python run_integration.py admin teacher    # just these
+#   python run_integration.py --jobs 2 -v      # limit parallelism, show every check
+#
+# Needs `npm install` (or termux_setup.py) and fix_routes.py done in the
+# project directory.
+
+import argparse
+import base64
+import hashlib
+import hmac
+import http.cookiejar
+import json
+import os
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+import urllib.error
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+ROOT = os.getcwd()
+BOOT_TIMEOUT = 15.0
+SESSION_SECRET = "integration-test-secret"
+
+# ---------- fixture ----------
+# Dates relative to today (local, like the server's default /admin/overview day),
+# so they fall inside the dashboards' 90-day window
+TODAY = date.today().isoformat()
+D1 = (date.today() - timedelta(days=2)).isoformat()
+D2 = (date.today() - timedelta(days=1)).isoformat()
+
+FIXTURE_SQL = f"""
+INSERT INTO users (id, name, email, role, class_name) VALUES
+  (1, 'Ada Admin', 'admin@it.test', 'admin', NULL),
+  (2, 'Tayo Teacher', 'teacher@it.test', 'teacher', NULL),
+  (3, 'Sola Student', 'sola@it.test', 'student', 'JSS1'),
+  (4, 'Bisi Student', 'bisi@it.test', 'student', 'JSS1'),
+  (5, 'Pat Parent', 'parent@it.test', 'parent', NULL);
+INSERT INTO parent_student (parent_id, student_id) VALUES (5, 3);
+INSERT INTO jobs (id, title) VALUES (1, 'Lab assistant');
+INSERT INTO job_apps (job_id, name, email) VALUES
+  (1, 'Ngozi Applicant', 'ngozi@it.test'),
+  (1, '@Emeka Applicant', 'emeka@it.test');
+INSERT INTO attendance (student_id, date, status) VALUES
+  (3, '{D1}', 'present'), (4, '{D1}', 'present'), (3, '{D2}', 'absent');
+"""
+
+# role -> seeded user id with a logged-in session
+SESSION_USERS = {"admin": 1, "teacher": 2, "student": 3, "parent": 5}
+
+# ---------- suites ----------
+def check(method, path, status, json_has=None, body=None, times=1, user=None,
+          text_has=(), text_lacks=(), headers_has=None, rows=None):
+    """One HTTP expectation. `times` repeats the request; only the last
+    response is checked (handy for rate limits). `user` sends that role's
+    seeded session; `rows` counts CSV/NDJSON data lines (header excluded)."""
+    return {"method": method, "path": path, "status": status,
+            "json_has": json_has or {}, "body": body, "times": times, "user": user,
+            "text_has": list(text_has), "text_lacks": list(text_lacks),
+            "headers_has": headers_has or {}, "rows": rows}
+
+def roll(date_, *records, **extra):
+    """Body for POST /teacher/attendance/bulk: roll(day, (student_id, status), ...)."""
+    return {"date": date_, "records": [{"student_id": s, "status": st} for s, st in records], **extra}
+
+SUITES = {
+    "auth": [
+        check("GET", "/health/live", 200, {"status": "alive"}),
+        check("GET", "/health/ready", 200, {"ok": True}),
+        check("POST", "/login", 429, body={"email": "brute@x.test", "password": "nope"}, times=11),
+    ],
+    "admin": [
+        check("GET", "/admin/health", 200, {"service": "admin"}),
+        check("GET", "/admin/export/attendance.csv", 403),
+        check("GET", "/admin/overview", 403),
+        check("GET", "/admin/overview", 403, user="student"),
+        check("GET", f"/admin/overview?date={D1}", 200, user="admin", json_has={
+            "date": D1, "users": {"admin": 1, "teacher": 1, "student": 2, "parent": 1},
+            "jobs": 1, "applications": 2, "applicationsByJob": {"1": 2}, "attendance": {"present": 2}}),
+        check("GET", "/admin/overview?date=2025-02-30", 200, {"date": TODAY}, user="admin"),
+        check("GET", "/admin/export/attendance.csv?gzip=0", 200, user="admin", rows=3,
+              text_has=["id,date,student_id,student_name,class_name,status", "Sola Student", "absent"]),
+        check("GET", f"/admin/export/attendance.csv?gzip=0&from={D2}&to={D2}", 200, user="admin", rows=1),
+        check("GET", "/admin/export/attendance.csv?gzip=0&class=JSS2", 200, user="admin", rows=0),
+        check("GET", "/admin/export/job_apps.ndjson?gzip=0", 200, user="admin", rows=2,
+              text_has=["Ngozi Applicant", "Lab assistant"]),
+        # Applicant text that Excel would run as a formula is neutralised
+        check("GET", "/admin/export/job_apps.csv?gzip=0", 200, user="admin", rows=2,
+              text_has=['"\'@Emeka Applicant"']),
+    ],
+    "teacher": [
+        check("GET", "/teacher/health", 200, {"service": "teacher"}),
+        check("POST", "/teacher/attendance/bulk", 403, body=roll(TODAY, (3, "present"))),
+        check("POST", "/teacher/attendance/bulk", 403, body=roll(TODAY, (3, "present")), user="student"),
+        check("POST", "/teacher/attendance/bulk", 400, body=roll("2025-02-30", (3, "present")), user="teacher"),
+        check("POST", "/teacher/attendance/bulk", 400, body=roll(TODAY, (99, "present")), user="teacher"),
+        check("POST", "/teacher/attendance/bulk", 400, body=roll(TODAY, (3, "asleep")), user="teacher"),
+        check("POST", "/teacher/attendance/bulk", 400,
+              body=roll(TODAY, (3, "present"), class_name="JSS2"), user="teacher"),
+        check("POST", "/teacher/attendance/bulk", 400, text_has=["class_name must be a string"],
+              body=roll(TODAY, (3, "present"), class_name={"$ne": None}), user="teacher"),
+        check("POST", "/teacher/attendance/bulk", 200, {"ok": True, "date": TODAY, "saved": 2},
+              body=roll(TODAY, (3, "present"), (4, "late"), class_name="JSS1"), user="teacher"),
+        # Re-marking a day updates in place (one row per student per day)
+        check("POST", "/teacher/attendance/bulk", 200, {"saved": 1},
+              body=roll(TODAY, (4, "excused")), user="teacher"),
+        check("GET", "/admin/overview", 200, {"date": TODAY, "attendance": {"present": 1, "excused": 1}},
+              user="admin"),
+        check("GET", f"/admin/export/attendance.csv?gzip=0&from={TODAY}&to={TODAY}", 200, user="admin", rows=2,
+              text_has=["excused"], text_lacks=["late"]),
+    ],
+    "student": [
+        check("GET", "/student/health", 200, {"service": "student"}),
+        check("GET", "/student", 200, user="student", headers_has={"X-Page-Cache": "miss"},
+              text_has=["Sola Student", D2, "absent", D1, "present"]),
+        check("GET", "/student", 200, user="student", headers_has={"X-Page-Cache": "hit"}),
+        # A roll call invalidates the cached dashboard
+        check("POST", "/teacher/attendance/bulk", 200, {"saved": 1}, body=roll(TODAY, (3, "late")), user="teacher"),
+        check("GET", "/student", 200, user="student", headers_has={"X-Page-Cache": "miss"},
+              text_has=[TODAY, "late"]),
+    ],
+    "parent": [
+        check("GET", "/parent/health", 200, {"service": "parent"}),
+        check("GET", "/parent", 200, user="parent", headers_has={"X-Page-Cache": "miss"},
+              text_has=["Sola Student (JSS1)", D2, "absent"], text_lacks=["Bisi Student"]),
+        check("GET", "/parent", 200, user="parent", headers_has={"X-Page-Cache": "hit"}),
+        check("POST", "/teacher/attendance/bulk", 200, {"saved": 1}, body=roll(TODAY, (3, "excused")), user="teacher"),
+        check("GET", "/parent", 200, user="parent", headers_has={"X-Page-Cache": "miss"},
+              text_has=[TODAY, "excused"]),
+    ],
+    "jobs": [
+        check("GET", "/jobs/health", 200),
+    ],
+}
+
+# ---------- server instance ----------
+def sign_sid(sid):
+    """express-session cookie value: 's:' + sid + '.' + base64 HMAC-SHA256, unpadded."""
+    mac = hmac.new(SESSION_SECRET.encode(), sid.encode(), hashlib.sha256).digest()
+    return "s:" + sid + "." + base64.b64encode(mac).decode().rstrip("=")
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+class Instance:
+    """`node server.js` on a private port with a private database."""
+
+    def __init__(self, root):
+        self.root = root
+        self.tmp = tempfile.mkdtemp(prefix="portal-it-")
+        self.port = free_port()
+        self.base = f"http://127.0.0.1:{self.port}"
+        self.log_path = os.path.join(self.tmp, "server.log")
+        self.proc = None
+
+    def __enter__(self):
+        env = dict(os.environ,
+                   PORT=str(self.port),
+                   DB_PATH=os.path.join(self.tmp, "data.sqlite"),
+                   WEB_CONCURRENCY="1",
+                   NODE_ENV="test",
+                   SESSION_STORE="sqlite",
+                   SESSION_SECRET=SESSION_SECRET,
+                   HEALTH_INTERVAL_MS="200")
+        env["SMTP_HOST"] = ""  # never talk to a real mail server (overrides src/config.js)
+        self.log = open(self.log_path, "w")
+        self.proc = subprocess.Popen(["node", "server.js"], cwd=self.root, env=env,
+                                     stdout=self.log, stderr=subprocess.STDOUT)
+        self._wait_ready()
+        self.cookies = self._seed()
+        return self
+
+    def _wait_ready(self):
+        deadline = time.monotonic() + BOOT_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f"server exited with {self.proc.returncode}")
+            try:
+                with urllib.request.urlopen(self.base + "/health/ready", timeout=1):
+                    return
+            except (urllib.error.URLError, ConnectionError, socket.timeout):
+                time.sleep(0.05)
+        raise RuntimeError(f"server not ready after {BOOT_TIMEOUT:.0f}s")
+
+    def _seed(self):
+        """Loads FIXTURE_SQL and one session per role; returns role -> Cookie header."""
+        conn = sqlite3.connect(os.path.join(self.tmp, "data.sqlite"), timeout=5)
+        try:
+            conn.executescript(FIXTURE_SQL)
+            expires = datetime.now(timezone.utc) + timedelta(hours=1)
+            cookies = {}
+            for role, uid in SESSION_USERS.items():
+                name, email = conn.execute("SELECT name, email FROM users WHERE id = ?", (uid,)).fetchone()
+                sess = {"cookie": {"originalMaxAge": 3600000, "expires": expires.isoformat().replace("+00:00", "Z"),
+                                   "httpOnly": True, "path": "/"},
+                        "user": {"id": uid, "name": name, "email": email, "role": role}}
+                sid = f"it-{role}"
+                conn.execute("INSERT INTO sessions (sid, expires, sess) VALUES (?, ?, ?)",
+                             (sid, int(expires.timestamp() * 1000), json.dumps(sess)))
+                cookies[role] = f"connect.sid={sign_sid(sid)}"
+            conn.commit()
+            return cookies
+        finally:
+            conn.close()
+
+    def log_tail(self, n=20):
+        with open(self.log_path, encoding="utf-8", errors="replace") as f:
+            return "".join(f.readlines()[-n:])
+
+    def __exit__(self, *exc):
+        if self.proc and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait()
+        self.log.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+# ---------- running ----------
+def request(opener, inst, c):
+    data = None
+    headers = {}
+    if c["body"] is not None:
+        data = json.dumps(c["body"]).encode()
+        headers["Content-Type"] = "application/json"
+    if c["user"]:
+        headers["Cookie"] = inst.cookies[c["user"]]
+    req = urllib.request.Request(inst.base + c["path"], data=data, method=c["method"], headers=headers)
+    try:
+        with opener.open(req, timeout=10) as res:
+            return res.status, res.headers, res.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+def run_check(opener, inst, c):
+    for _ in range(c["times"]):
+        status, headers, raw = request(opener, inst, c)
+    if status != c["status"]:
+        return f"expected {c['status']}, got {status}: {raw[:200]!r}"
+    for k, v in c["headers_has"].items():
+        if headers.get(k) != v:
+            return f"expected header {k}: {v}, got {headers.get(k)!r}"
+    text = raw.decode("utf-8", "replace")
+    for needle in c["text_has"]:
+        if needle not in text:
+            return f"expected {needle!r} in body: {raw[:200]!r}"
+    for needle in c["text_lacks"]:
+        if needle in text:
+            return f"unexpected {needle!r} in body"
+    if c["rows"] is not None:
+        lines = [line for line in text.splitlines() if line]
+        n = len(lines) - 1 if ".csv" in c["path"] else len(lines)
+        if n != c["rows"]:
+            return f"expected {c['rows']} row(s), got {n}"
+    if c["json_has"]:
+        try:
+            payload = json.loads(raw)
+        except ValueError:
+            return f"expected JSON, got {raw[:200]!r}"
+        for k, v in c["json_has"].items():
+            if payload.get(k) != v:
+                return f"expected {k}={v!r}, got {payload.get(k)!r}"
+    return None
+
+def run_suite(name, root):
+    """Runs in a pool process. Returns (name, [(label, error|None)], seconds, log)."""
+    t0 = time.monotonic()
+    results = []
+    log = ""
+    try:
+        with Instance(root) as inst:
+            # Each suite gets its own cookie jar, i.e. its own session
+            opener = urllib.request.build_opener(
+                urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+            for c in SUITES[name]:
+                label = f"{c['method']} {c['path']}" + (f" as {c['user']}" if c["user"] else "")
+                results.append((label, run_check(opener, inst, c)))
+            if any(err for _, err in results):
+                log = inst.log_tail()
+    except Exception as e:
+        results.append(("server", f"{type(e).__name__}: {e}"))
+    return name, results, time.monotonic() - t0, log
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Run router integration suites in parallel")
+    ap.add_argument("suites", nargs="*", help=f"subset of: {', '.join(SUITES)}")
+    ap.add_argument("--jobs", "-j", type=int, default=len(SUITES), help="parallel servers")
+    ap.add_argument("--verbose", "-v", action="store_true")
+    args = ap.parse_args(argv)
+
+    names = args.suites or list(SUITES)
+    unknown = [n for n in names if n not in SUITES]
+    if unknown:
+        raise SystemExit(f"❌ Unknown suite(s): {', '.join(unknown)}")
+    if not os.path.exists(os.path.join(ROOT, "server.js")):
+        raise SystemExit("❌ server.js not found; run this from the project directory")
+
+    t0 = time.monotonic()
+    failed = 0
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = [pool.submit(run_suite, n, ROOT) for n in names]
+        for fut in as_completed(futures):
+            name, results, secs, log = fut.result()
+            bad = [(label, err) for label, err in results if err]
+            failed += len(bad)
+            mark = "❌" if bad else "✓"
+            print(f"{mark} {name}: {len(results) - len(bad)}/{len(results)} passed ({secs:.2f}s)")
+            for label, err in results:
+                if err:
+                    print(f"    ✗ {label}: {err}")
+                elif args.verbose:
+                    print(f"    ✓ {label}")
+            if log:
+                print("    --- server log (tail) ---")
+                print("    " + log.replace("\n", "\n    ").rstrip())
+
+    print(f"\n{'❌' if failed else '✅'} {len(names)} suites, {failed} failure(s) in {time.monotonic() - t0:.2f}s")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
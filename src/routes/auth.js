@@ -15,14 +15,7 @@ router.get('/health', (req, res) => {
   res.json({ ok: true, route: 'auth' });
 });
 
-// example list endpoint
-router.get('/', (req, res) => {
-  res.json({ route: 'auth', message: 'auth root works' });
-});
-
-// 404 for unknown subpaths of this router (optional)
-router.use((req, res) => {
-  res.status(404).json({ error: 'Not found in auth routes', path: req.originalUrl });
-});
+// No catch-all or GET '/' here: this router is mounted at '/', so either one
+// would answer for the home page and for the app's 404 handler.
 
 module.exports = router;
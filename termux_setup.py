@@ -3,7 +3,7 @@
 termux_setup.py
 - Switches project to better-sqlite3 (no compiler issues on Termux)
 - Installs server dependencies
-- Writes server.js and db.js with safe backups
+- Writes server.js, db.js and src/utils/* helpers with safe backups
 
 Usage:
   python termux_setup.py
@@ -15,6 +15,17 @@ import subprocess
 from datetime import datetime
 from shutil import which
 
+from counters import COUNTERS_SQL
+from export_data import EXPORT_JS
+from make_config import build as build_config
+from make_health import HEALTH_JS
+from make_metrics import METRICS_JS
+from make_pagecache import PAGECACHE_JS
+from make_profiler import PROFILER_JS
+from make_ratelimit import RATELIMIT_JS
+from make_sessionstore import SESSIONSTORE_JS
+from make_shutdown import SHUTDOWN_JS
+
 # ---------- helpers ----------
 def sh(cmd, cwd=None):
     print(f"\n$ {cmd}")
@@ -46,26 +57,72 @@ def ensure_not_in_storage():
 
 # ---------- file contents ----------
 SERVER_JS = r"""// server.js
-require('dotenv').config();
-
+// Settings come from src/config.js (python make_config.py validates .env into it)
+const config = require('./src/config');
+const cluster = require('cluster');
+const http = require('http');
 const path = require('path');
 const express = require('express');
 const bodyParser = require('body-parser');
 const cors = require('cors');
 const session = require('express-session');
 
+/* ------------ Cluster ------------ */
+// WEB_CONCURRENCY comes from the make_env.py performance profile.
+// In-memory sessions are per process, so SESSION_STORE=memory runs one worker.
+const WORKERS = config.SESSION_STORE === 'memory' ? 1 : config.WEB_CONCURRENCY;
+if (cluster.isPrimary && WORKERS < config.WEB_CONCURRENCY) {
+  console.warn('⚠️  SESSION_STORE=memory: ignoring WEB_CONCURRENCY, running 1 worker');
+}
+if (cluster.isPrimary && WORKERS > 1) {
+  require('./src/utils/ratelimit').servePrimary(); // buckets shared by all workers
+  require('./src/utils/pagecache').servePrimary(); // relays page-cache invalidations
+  require('./src/utils/metrics').servePrimary(); // sums every worker's numbers per scrape
+  require('./src/utils/shutdown').supervise(WORKERS); // forks, re-forks, drains, rolls on SIGUSR2
+  return; // the primary only supervises; workers run the app below
+}
+
+const db = require('./db');
+const health = require('./src/utils/health');
+const metrics = require('./src/utils/metrics');
+const ratelimit = require('./src/utils/ratelimit');
+const shutdown = require('./src/utils/shutdown');
+
 const app = express();
 
 /* ------------ Basics ------------ */
+// Instrumentation first so it times everything below (no-op unless METRICS_ENABLED=true)
+app.use(metrics.middleware());
+metrics.instrumentApp(app);
+
+// Probe/scrape endpoints answer before CORS, body parsing and sessions (and
+// before any router mounted at '/'), so they stay cheap and can't be shadowed.
+app.get('/health', health.handler('ready'));
+app.get('/health/live', health.handler('live'));
+app.get('/health/ready', health.handler('ready'));
+app.get('/metrics', metrics.handler);
+
 app.use(cors());
+
+// Optional gzip for bodies above the profile's threshold (npm i compression)
+try {
+  const compression = require('compression');
+  app.use(compression({ threshold: config.COMPRESSION_THRESHOLD }));
+} catch {
+  // compression not installed; serve uncompressed
+}
+
 app.use(bodyParser.urlencoded({ extended: true }));
 app.use(bodyParser.json());
 
-// NOTE: in-memory session store is fine for Termux/dev.
-// For production, use a persistent store (connect-sqlite3/redis, etc).
+// Sessions live in SQLite so every cluster worker sees the same logins
+// (SESSION_STORE=memory keeps them per process; WORKERS is forced to 1 above).
+const { SqliteStore } = require('./src/utils/sessionstore');
+const sessionStore = config.SESSION_STORE === 'memory' ? new session.MemoryStore() : new SqliteStore(db);
 app.use(
   session({
-    secret: process.env.SESSION_SECRET || 'dev-session-secret',
+    store: sessionStore,
+    secret: config.SESSION_SECRET,
     resave: false,
     saveUninitialized: false,
     cookie: { maxAge: 1000 * 60 * 60 }, // 1 hour
@@ -78,7 +135,31 @@ app.set('view engine', 'ejs');
 app.set('views', path.join(__dirname, 'views'));
 
 // Optional global available in all EJS templates
-app.locals.siteName = process.env.SITE_NAME || 'School Portal';
+app.locals.siteName = config.SITE_NAME;
+
+/* ------------ Rate limits ------------ */
+// Behind a reverse proxy req.ip would be the proxy for every client; TRUST_PROXY
+// names the hops whose X-Forwarded-For is believed (a hop count or addresses).
+if (config.TRUST_PROXY) {
+  app.set('trust proxy', /^\d+$/.test(config.TRUST_PROXY) ? Number(config.TRUST_PROXY) : config.TRUST_PROXY);
+}
+
+// Checked before any route handler, so rejected requests never reach hashing or the DB.
+// The per-IP buckets are larger: a school behind one NAT address shares them.
+const authLimit = ratelimit.limit({
+  name: 'auth',
+  perMinute: config.RATE_LIMIT_AUTH_PER_MIN,
+  perMinuteIp: config.RATE_LIMIT_AUTH_PER_MIN_IP,
+  account: (req) => req.body && (req.body.email || req.body.username),
+});
+const pinLimit = ratelimit.limit({
+  name: 'pin',
+  perMinute: config.RATE_LIMIT_PIN_PER_MIN,
+  perMinuteIp: config.RATE_LIMIT_PIN_PER_MIN_IP,
+  account: (req) => (req.body && req.body.student_id) || req.params.studentId,
+});
+app.post(['/login', '/register', '/forgot', '/reset'], authLimit);
+app.all(['/results', '/report/:studentId'], pinLimit);
 
 /* ------------ Routes ------------ */
 // Your route files should `module.exports = router`
@@ -90,12 +171,13 @@ try {
   const parentRoutes     = require('./src/routes/parent');
   const employmentRoutes = require('./src/routes/employment');
 
-  app.use('/', authRoutes);
   app.use('/admin', adminRoutes);
   app.use('/teacher', teacherRoutes);
   app.use('/student', studentRoutes);
   app.use('/parent', parentRoutes);
   app.use('/jobs', employmentRoutes);
+  // Mounted at '/', so it goes last: it sees every path the role routers don't take
+  app.use('/', authRoutes);
 } catch (e) {
   // If some route files aren’t present yet, don’t crash during setup
   console.warn('⚠️  Some route modules were not loaded:', e.message);
@@ -111,7 +193,26 @@ app.get('/', (req, res) => {
   }
 });
 
-app.get('/health', (_req, res) => res.json({ ok: true }));
+// Probes run in the background; /health* (above) only reads the cached results.
+health.register('sqlite', () => db.prepare('SELECT 1').get());
+health.register('session', () => new Promise((resolve, reject) => {
+  sessionStore.get('__health__', (err) => (err ? reject(err) : resolve()));
+}));
+if (config.SMTP_HOST) {
+  const nodemailer = require('nodemailer');
+  const mailer = nodemailer.createTransport({
+    host: config.SMTP_HOST,
+    port: config.SMTP_PORT,
+    secure: config.SMTP_SECURE,
+    auth: { user: config.SMTP_USER, pass: config.SMTP_PASS },
+  });
+  // Mail is degraded, not fatal: report it but keep serving.
+  health.register('smtp', () => mailer.verify(), {
+    critical: false,
+    intervalMs: config.HEALTH_SMTP_INTERVAL_MS,
+  });
+}
+health.start();
 
 /* ------------ 404 & Errors ------------ */
 app.use((req, res, next) => {
@@ -131,19 +232,42 @@ app.use((err, _req, res, _next) => {
 });
 
 /* ------------ Start ------------ */
-const PORT = process.env.PORT || 3000;
-app.listen(PORT, () => {
-  console.log(`✅ Server running on http://localhost:${PORT}`);
+const PORT = config.PORT;
+const server = http.createServer(app);
+server.maxConnections = config.MAX_CONNECTIONS;
+// Reused connections save a TCP (+TLS) handshake per page on slow links. Behind
+// a proxy, keep-alive must outlast the proxy's idle timeout. headersTimeout
+// stays above it so a reused socket isn't cut while a request arrives.
+server.keepAliveTimeout = config.KEEP_ALIVE_TIMEOUT_MS;
+server.headersTimeout = Math.max(config.HEADERS_TIMEOUT_MS, server.keepAliveTimeout + 1000);
+server.requestTimeout = config.REQUEST_TIMEOUT_MS;
+
+// SIGTERM/SIGINT: fail readiness, drain in-flight requests, then run the
+// shutdown hooks (db.js checkpoints the WAL last) and exit.
+shutdown.onDrain(() => health.drain());
+shutdown.onShutdown(() => health.stop());
+shutdown.graceful(server);
+
+server.listen({ port: PORT, backlog: config.LISTEN_BACKLOG }, () => {
+  console.log(`✅ Server running on http://localhost:${PORT} (pid ${process.pid})`);
 });
 """
 
 DB_JS = r"""// db.js  (better-sqlite3)
 const Database = require('better-sqlite3');
 const path = require('path');
+const config = require('./src/config');
+const metrics = require('./src/utils/metrics');
+const shutdown = require('./src/utils/shutdown');
 
-const dbPath = path.join(__dirname, 'data.sqlite'); // change if you like
+const dbPath = config.DB_PATH || path.join(__dirname, 'data.sqlite'); // change if you like
 const db = new Database(dbPath);
 
+// Sized by the make_env.py performance profile (per process / cluster worker)
+db.pragma(`cache_size = -${config.SQLITE_CACHE_MB * 1024}`); // negative = KiB
+db.pragma(`mmap_size = ${config.SQLITE_MMAP_MB * 1024 * 1024}`);
+db.pragma('busy_timeout = 5000'); // cluster workers share the file
+
 // Example schema bootstrap (idempotent)
 db.exec(`
   PRAGMA journal_mode = WAL;
@@ -154,6 +278,7 @@ db.exec(`
     email TEXT UNIQUE,
     phone TEXT,
     role TEXT NOT NULL,
+    class_name TEXT,
     password_hash TEXT,
     pin_hash TEXT
   );
@@ -192,8 +317,66 @@ db.exec(`
   );
 `);
 
-module.exports = db;
-"""
+// Migrations for databases from older releases. Checked and applied under one
+// write lock, so cluster workers booting together don't race.
+const hasColumn = (table, col) => db.prepare(`PRAGMA table_info(${table})`).all().some((c) => c.name === col);
+const hasIndex = (name) => !!db.prepare("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?").get(name);
+db.transaction(() => {
+  // CREATE TABLE IF NOT EXISTS won't add columns to an existing table
+  if (!hasColumn('users', 'class_name')) db.exec('ALTER TABLE users ADD COLUMN class_name TEXT');
+
+  // One attendance row per student per day (bulk marking upserts on it).
+  // Older databases may hold duplicates: keep the newest row before indexing.
+  if (!hasIndex('ux_attendance_student_date')) {
+    db.exec(`
+      DELETE FROM attendance WHERE id NOT IN (SELECT max(id) FROM attendance GROUP BY student_id, date);
+      CREATE UNIQUE INDEX IF NOT EXISTS ux_attendance_student_date ON attendance(student_id, date);
+    `);
+  }
+}).immediate();
+
+// Indexes for date-range exports and class rosters
+db.exec(`
+  CREATE INDEX IF NOT EXISTS idx_users_class ON users(class_name);
+  CREATE INDEX IF NOT EXISTS idx_attendance_date ON attendance(date);
+  CREATE INDEX IF NOT EXISTS idx_job_apps_created ON job_apps(created_at);
+`);
+
+// Admin dashboard counters, kept exact by triggers (counters.py checks/repairs drift).
+// Created and backfilled in one write transaction so cluster workers don't race.
+const hasTable = (name) => !!db.prepare("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?").get(name);
+db.transaction(() => {
+  const fresh = !hasTable('counters');
+  db.exec(`
+__COUNTERS_SQL__`);
+  if (fresh) db.exec('INSERT INTO counters (name, value) SELECT name, value FROM counters_expected');
+}).immediate();
+
+// Registered first, so it runs last: after the server has drained and every
+// other hook has flushed its writes, fold the WAL back into the main file.
+shutdown.onShutdown(() => {
+  try {
+    db.pragma('wal_checkpoint(TRUNCATE)');
+  } finally {
+    db.close();
+  }
+});
+
+// Times every prepared statement when METRICS_ENABLED=true
+module.exports = metrics.instrumentDb(db);
+""".replace("__COUNTERS_SQL__", COUNTERS_SQL)
+
+# Support modules written alongside server.js / db.js
+UTIL_FILES = [
+    ("src/utils/health.js", HEALTH_JS),
+    ("src/utils/metrics.js", METRICS_JS),
+    ("src/utils/export.js", EXPORT_JS),
+    ("src/utils/ratelimit.js", RATELIMIT_JS),
+    ("src/utils/sessionstore.js", SESSIONSTORE_JS),
+    ("src/utils/profiler.js", PROFILER_JS),
+    ("src/utils/pagecache.js", PAGECACHE_JS),
+    ("src/utils/shutdown.js", SHUTDOWN_JS),
+]
 
 # ---------- main ----------
 def main():
@@ -213,19 +396,28 @@ def main():
     sh("npm uninstall sqlite3")
 
     # 2) install better-sqlite3 + other deps
-    deps = "better-sqlite3 express ejs body-parser cors express-session dotenv nodemailer"
+    deps = "better-sqlite3 express ejs body-parser cors express-session dotenv nodemailer compression"
     sh(f"npm i {deps}")
 
-    # 3) write server.js and db.js (with backups)
+    # 3) write server.js, db.js and helpers (with backups)
     backup_and_write("server.js", SERVER_JS)
     backup_and_write("db.js", DB_JS)
+    for path, content in UTIL_FILES:
+        backup_and_write(path, content)
+
+    # 4) compile .env (or the defaults) into src/config.js
+    if not build_config(os.getcwd()):
+        print("❌ Fix .env and run: python make_config.py")
 
     print("\n🎉 Done!")
     print("Next steps:")
     print("  1) Ensure your routes use the db helper, e.g.:")
     print("       const db = require('../db'); // adjust path")
     print("       const row = db.prepare('SELECT 1 as x').get();")
-    print("  2) Start the server:")
+    print("  2) Generate .env sized for this device (workers, SQLite cache, limits):")
+    print("       python make_env.py        (also rebuilds src/config.js)")
+    print("     After editing .env by hand: python make_config.py")
+    print("  3) Start the server:")
     print("       node server.js")
     print("     Then open: http://localhost:3000\n")
 
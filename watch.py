@@ -0,0 +1,189 @@
+# watch.py
+# Development watch mode: regenerate only what changed, then restart node.
+#
+# Polls the generator scripts (stdlib only, works on Termux without inotify).
+# When one changes it is re-imported, its templates are rendered in memory and
+# only outputs whose content actually differs are rewritten (no .bak files in
+# watch mode). If any .js output changed, the running server is restarted.
+#
+# Usage:
+#   python watch.py                 # watch + run `node server.js`
+#   python watch.py --no-server     # regenerate only
+#   python watch.py --once          # regenerate everything stale, then exit
+#
+# Editing the target's .env recompiles src/config.js (make_config.py) and
+# restarts node. The first time a file that differs from the generated output is
+# overwritten, it is kept as <file>.bak-<timestamp> first.
+#
+# The server runs with WEB_CONCURRENCY=1 so restarts don't wait on cluster forks,
+# and with a short SHUTDOWN_TIMEOUT_MS so a hung request can't stall a restart.
+
+import argparse
+import importlib.util
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+POLL_SECONDS = 0.25
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# source script -> function(module, target dir) returning [(output path, content)]
+# fix_routes.py holds the route manifest; editing it re-renders src/routes/*.js
+TARGETS = {
+    "termux_setup.py": lambda m, target: [("server.js", m.SERVER_JS.rstrip() + "\n"), ("db.js", m.DB_JS.rstrip() + "\n")],
+    "counters.py": lambda m, target: [("db.js", load("termux_setup.py").DB_JS.rstrip() + "\n")],  # SQL embedded in db.js
+    "make_metrics.py": lambda m, target: [("src/utils/metrics.js", m.METRICS_JS)],
+    "make_health.py": lambda m, target: [("src/utils/health.js", m.HEALTH_JS)],
+    "make_ratelimit.py": lambda m, target: [("src/utils/ratelimit.js", m.RATELIMIT_JS)],
+    "make_sessionstore.py": lambda m, target: [("src/utils/sessionstore.js", m.SESSIONSTORE_JS)],
+    "make_profiler.py": lambda m, target: [("src/utils/profiler.js", m.PROFILER_JS)],
+    "make_pagecache.py": lambda m, target: [("src/utils/pagecache.js", m.PAGECACHE_JS)],
+    "make_shutdown.py": lambda m, target: [("src/utils/shutdown.js", m.SHUTDOWN_JS)],
+    "export_data.py": lambda m, target: [("src/utils/export.js", m.EXPORT_JS)],
+    "fix_routes.py": lambda m, target: m.render_routes() + [("src/utils/validate.js", m.VALIDATE_JS),
+                                                           ("views/page.ejs", m.PAGE_EJS)],
+    "readme.py": lambda m, target: load("make_docs.py").render_site(),  # README.md + docs/guide.html
+    "make_docs.py": lambda m, target: m.render_site(),
+    "make_config.py": lambda m, target: [("src/config.js", m.compile_env(os.path.join(target, ".env")))],
+}
+
+# Non-script inputs in the target directory: file -> generator to re-run when it changes
+INPUTS = {".env": "make_config.py"}
+
+# Outputs that hold secrets (baked from .env): owner-only permissions
+SECRET_OUTPUTS = {os.path.join("src", "config.js")}
+
+# ---------- helpers ----------
+def load(script):
+    """Import a generator script fresh (never from the sys.modules cache)."""
+    # Generators import each other (termux_setup embeds counters.COUNTERS_SQL);
+    # drop cached siblings so those imports pick up edits too
+    for sibling in os.listdir(ROOT):
+        if sibling.endswith(".py") and sibling != "watch.py":
+            sys.modules.pop(sibling[:-3], None)
+    name = f"_watch_{os.path.splitext(script)[0]}_{time.monotonic_ns()}"
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, script))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+# Outputs already backed up this session; later rewrites only replace our own output
+backed_up = set()
+
+def write_if_changed(target_dir, rel, content):
+    path = os.path.join(target_dir, rel)
+    try:
+        with open(path, encoding="utf-8") as f:
+            if f.read() == content:
+                return False
+        existed = True
+    except FileNotFoundError:
+        existed = False
+    # First overwrite of a file we didn't write: keep it, like backup_and_write.
+    # Compiled secrets are rebuilt from .env and aren't worth another copy.
+    if existed and path not in backed_up and os.path.normpath(rel) not in SECRET_OUTPUTS:
+        bak = f"{path}.bak-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        shutil.copy2(path, bak)
+        print(f"• Backed up {rel} -> {os.path.basename(bak)}")
+    backed_up.add(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(content)
+    if os.path.normpath(rel) in SECRET_OUTPUTS:
+        os.chmod(tmp, 0o600)
+    os.replace(tmp, path)  # node never sees a half-written file
+    return True
+
+def regenerate(script, target_dir):
+    """Returns the list of outputs rewritten; [] if the script fails to load."""
+    try:
+        outputs = TARGETS[script](load(script), target_dir)
+    except Exception as e:  # keep watching through typos in a template
+        print(f"❌ {script}: {type(e).__name__}: {e}")
+        return []
+    changed = [rel for rel, content in outputs if write_if_changed(target_dir, rel, content)]
+    for rel in changed:
+        print(f"✓ {script} -> {rel}")
+    return changed
+
+def mtimes(target_dir):
+    out = {}
+    paths = [(s, os.path.join(ROOT, s)) for s in TARGETS] + [(i, os.path.join(target_dir, i)) for i in INPUTS]
+    for name, path in paths:
+        try:
+            out[name] = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            out[name] = None
+    return out
+
+# ---------- server process ----------
+class Server:
+    def __init__(self, target_dir):
+        self.target_dir = target_dir
+        self.proc = None
+
+    def start(self):
+        env = dict(os.environ, WEB_CONCURRENCY="1", SHUTDOWN_TIMEOUT_MS="1000")
+        self.proc = subprocess.Popen(["node", "server.js"], cwd=self.target_dir, env=env)
+
+    def stop(self):
+        if not self.proc or self.proc.poll() is not None:
+            return
+        self.proc.send_signal(signal.SIGTERM)  # drains, checkpoints the WAL, exits
+        try:
+            self.proc.wait(timeout=3)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+
+    def restart(self):
+        t0 = time.monotonic()
+        self.stop()
+        self.start()
+        print(f"↻ Restarted node (pid {self.proc.pid}) in {1000 * (time.monotonic() - t0):.0f} ms")
+
+# ---------- main ----------
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Regenerate changed templates and restart the server")
+    ap.add_argument("target", nargs="?", default=os.getcwd(), help="project directory (default: cwd)")
+    ap.add_argument("--no-server", action="store_true", help="don't run node server.js")
+    ap.add_argument("--once", action="store_true", help="regenerate stale outputs and exit")
+    args = ap.parse_args(argv)
+    target_dir = os.path.abspath(args.target)
+
+    # Bring every output up to date first (cheap: unchanged files aren't touched)
+    for script in TARGETS:
+        regenerate(script, target_dir)
+    if args.once:
+        return
+
+    server = None if args.no_server else Server(target_dir)
+    if server:
+        server.start()
+    print(f"👀 Watching {len(TARGETS)} generator scripts (Ctrl+C to stop)")
+
+    seen = mtimes(target_dir)
+    try:
+        while True:
+            time.sleep(POLL_SECONDS)
+            now = mtimes(target_dir)
+            changed = []
+            for script, mtime in now.items():
+                if mtime != seen[script] and mtime is not None:
+                    changed += regenerate(INPUTS.get(script, script), target_dir)
+            seen = now
+            if server and any(rel.endswith(".js") for rel in changed):
+                server.restart()
+    except KeyboardInterrupt:
+        print("\nStopping…")
+    finally:
+        if server:
+            server.stop()
+
+if __name__ == "__main__":
+    main()